@@ -0,0 +1,44 @@
+"""Add indexes for hot query paths
+
+Revision ID: b44f42af8036
+Revises: 39ea02eb5bb1
+Create Date: 2026-10-18 09:37:04.299691
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b44f42af8036'
+down_revision: Union[str, None] = '39ea02eb5bb1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # save_answers appends rows, so a project can hold the same question twice.
+    # Keep the newest answer per question before the unique index is built.
+    op.execute("""
+        DELETE FROM onboarding_answers older
+        USING onboarding_answers newer
+        WHERE older.project_id = newer.project_id
+          AND older.question = newer.question
+          AND (older.created_at, older.id) < (newer.created_at, newer.id)
+    """)
+
+    # CONCURRENTLY builds without locking writes but cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_consulting_requests_user_id'), 'consulting_requests', ['user_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('uq_onboarding_answers_project_id_question', 'onboarding_answers', ['project_id', 'question'], unique=True, postgresql_concurrently=True)
+        op.create_index(op.f('ix_plan_section_analyses_business_plan_id'), 'plan_section_analyses', ['business_plan_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_projects_user_id_name', 'projects', ['user_id', 'name'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_projects_user_id_name', table_name='projects', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_plan_section_analyses_business_plan_id'), table_name='plan_section_analyses', postgresql_concurrently=True)
+        op.drop_index('uq_onboarding_answers_project_id_question', table_name='onboarding_answers', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_consulting_requests_user_id'), table_name='consulting_requests', postgresql_concurrently=True)
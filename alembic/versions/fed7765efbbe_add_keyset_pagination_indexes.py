@@ -0,0 +1,32 @@
+"""Add keyset pagination indexes
+
+Revision ID: fed7765efbbe
+Revises: b44f42af8036
+Create Date: 2026-10-18 09:38:16.187374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fed7765efbbe'
+down_revision: Union[str, None] = 'b44f42af8036'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_consulting_requests_user_id_created_at_id', 'consulting_requests', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_projects_user_id_created_at_id', 'projects', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        # Covered by the new index's leading column
+        op.drop_index(op.f('ix_consulting_requests_user_id'), table_name='consulting_requests', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_consulting_requests_user_id'), 'consulting_requests', ['user_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_projects_user_id_created_at_id', table_name='projects', postgresql_concurrently=True)
+        op.drop_index('ix_consulting_requests_user_id_created_at_id', table_name='consulting_requests', postgresql_concurrently=True)
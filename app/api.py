@@ -1,9 +1,20 @@
 from fastapi import APIRouter
-from app.routers import auth as auth_router
-from app.routers import projects as projects_router
-from app.routers import onboarding as onboarding_router
-from app.routers import plans as plans_router
-from app.routers import consulting as consulting_router
+from app.config import settings
+
+if settings.ASYNC_DB:
+    from app.routers.aio import auth as auth_router
+    from app.routers.aio import projects as projects_router
+    from app.routers.aio import onboarding as onboarding_router
+    from app.routers.aio import plans as plans_router
+    from app.routers.aio import consulting as consulting_router
+    from app.routers.aio import admin as admin_router
+else:
+    from app.routers import auth as auth_router
+    from app.routers import projects as projects_router
+    from app.routers import onboarding as onboarding_router
+    from app.routers import plans as plans_router
+    from app.routers import consulting as consulting_router
+    from app.routers import admin as admin_router
 
 api_router = APIRouter()
 
@@ -12,3 +23,4 @@ api_router.include_router(projects_router.router)
 api_router.include_router(onboarding_router.router)
 api_router.include_router(plans_router.router)
 api_router.include_router(consulting_router.router)
+api_router.include_router(admin_router.router)
@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU cache with an optional TTL per entry.
+    Holds at most `max_entries` items; the least recently used one is evicted first.
+    """
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class RedisCache:
+    """
+    Cache shared by every process, on Redis (`pip install redis`).
+    Values must be JSON serializable; TTLs are rounded up to whole seconds.
+    """
+    def __init__(self, url: str, prefix: str, default_ttl: Optional[float] = None):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.default_ttl
+        self.client.set(self.prefix + key, json.dumps(value, default=str), ex=int(ttl + 0.999) if ttl else None)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
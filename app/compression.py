@@ -0,0 +1,50 @@
+import gzip
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it responses fall back to gzip
+    brotli = None
+
+def gzip_bytes(data: bytes) -> bytes:
+    """Compresses once at write time, so the strongest level is worth it."""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses of at least `minimum_size` bytes: brotli when the client accepts it
+    and the `brotli` package is installed, gzip otherwise. Responses that already carry a
+    Content-Encoding (e.g. a pre-compressed plan) and SSE streams are passed through untouched.
+    """
+    def __init__(self, app, minimum_size: int = 1000, compresslevel: int = 6, brotli_quality: int = 4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None:
+            if "br" in Headers(scope=scope).get("Accept-Encoding", ""):
+                responder = BrotliResponder(
+                    self.app, self.minimum_size, quality=self.brotli_quality,
+                    exclude_content_types=self.exclude_content_types,
+                )
+                await responder(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = 4, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            # Low quality levels: close to gzip speed with noticeably smaller output on text
+            self._compressor = brotli.Compressor(quality=self.quality)
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
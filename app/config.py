@@ -1,5 +1,6 @@
+import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, validator
 
 class Settings(BaseSettings):
@@ -9,15 +10,86 @@ class Settings(BaseSettings):
     # Database
     # Use the Connection String from Supabase (Settings -> Database -> Connection String)
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # below Supabase/pgbouncer idle timeouts
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 disables
+    # No client-side pool: every session opens its own connection. Always on for Vercel deployments
+    DB_NULL_POOL: bool = False
+    # Set when DATABASE_URL points at pgbouncer/Supavisor in transaction mode (e.g. port 6543)
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
+    # Serve the API from async routers on AsyncSession/asyncpg instead of sync sessions on the threadpool
+    ASYNC_DB: bool = False
 
     # App Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12  # existing hashes with another cost are upgraded at login
+    PASSWORD_HASH_PROCESSES: Optional[int] = None  # bcrypt process pool size; None = CPU count, 0 = no pool
+
+    # Authenticated user lookups: "memory" (per process), "redis" (shared, needs REDIS_URL) or "none"
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    REDIS_URL: Optional[str] = None
+
+    # Per-user token buckets by access level and scope: "api" (every route) and "generation"
+    # (POST /projects/{id}/complete). "N/period" allows bursts of N, refilled over the period;
+    # a scope missing from a level is not limited. Levels not listed get RATE_LIMIT_DEFAULT_TIER.
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per process), "redis" (shared, needs REDIS_URL) or "none"
+    RATE_LIMITS: Dict[str, Dict[str, str]] = {
+        "free": {"api": "120/minute", "generation": "5/hour"},
+        "pro": {"api": "600/minute", "generation": "60/hour"},
+        "admin": {},
+    }
+    RATE_LIMIT_DEFAULT_TIER: str = "free"
+    RATE_LIMIT_MAX_ENTRIES: int = 100000
     
     # AI Config
     GEMINI_API_KEY: str | None = None
-    
+    LLM_BACKEND: str = "gemini"  # "gemini" or "fake" (offline, for development and load tests)
+    LLM_MODEL: str = "gemini-2.5-flash"
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_REQUESTS_PER_MINUTE: int = 60
+    FAKE_LLM_LATENCY_SECONDS: float = 0.0
+    LLM_CACHE_BACKEND: str = "memory"  # "memory" (per process), "database" (shared) or "none"
+    LLM_CACHE_MAX_ENTRIES: int = 256
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # "single" (one call for the whole plan) or "sections" (one call per top-level section, in parallel)
+    PLAN_GENERATION_MODE: str = "single"
+
+    # Plan streaming: generated markdown is appended to the plan row in batches
+    PLAN_STREAM_FLUSH_CHARS: int = 2000
+    PLAN_STREAM_FLUSH_SECONDS: float = 2.0
+    PLAN_STREAM_POLL_SECONDS: float = 1.0
+    # Keep a gzip copy of the finished plan markdown, served as-is by GET /projects/{id}/plan/markdown
+    PLAN_STORE_COMPRESSED: bool = False
+
+    # Response compression: brotli for clients that accept it, gzip otherwise
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1000  # bytes; smaller responses are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Generation worker (python -m app.worker)
+    WORKER_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 600
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: int = 30
+    # Scheduling weight by access level: users get running slots in proportion to it
+    # (levels not listed weigh 1; weights must be >= 1), and each user runs at most JOB_MAX_RUNNING_PER_USER jobs (0 = no cap)
+    JOB_PRIORITY_WEIGHTS: Dict[str, int] = {"free": 1, "pro": 4, "admin": 4}
+    JOB_MAX_RUNNING_PER_USER: int = 2
+    WORKER_METRICS_PORT: int = 9100  # Prometheus endpoint of each worker; 0 disables it
+
+    # Prometheus metrics on GET /metrics
+    METRICS_ENABLED: bool = True
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost", "http://localhost:3000", "https://business-plan-pipeline-web.vercel.app"]
 
@@ -43,7 +115,25 @@ class Settings(BaseSettings):
             return v
         raise ValueError(v)
 
+    @validator("JOB_PRIORITY_WEIGHTS")
+    def check_job_priority_weights(cls, v: Dict[str, int]) -> Dict[str, int]:
+        # The scheduler divides by the weight, so 0 would break every claim
+        invalid = {level: weight for level, weight in v.items() if weight < 1}
+        if invalid:
+            raise ValueError(f"Job priority weights must be at least 1: {invalid}")
+        return v
+
     def get_database_url(self) -> str:
         return self.DATABASE_URL
 
+    def get_password_hash_processes(self) -> int:
+        """bcrypt process pool size, 0 for no pool. Serverless instances skip it: spawning processes is not worth it there."""
+        if self.PASSWORD_HASH_PROCESSES == 0 or os.getenv("VERCEL"):
+            return 0
+        return self.PASSWORD_HASH_PROCESSES or os.cpu_count() or 1
+
+    def use_null_pool(self) -> bool:
+        # Serverless instances are frozen between requests, so pooled connections just go stale
+        return self.DB_NULL_POOL or bool(os.getenv("VERCEL"))
+
 settings = Settings()
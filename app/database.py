@@ -1,10 +1,101 @@
-from sqlalchemy import create_engine
+import time
+from uuid import uuid4
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.config import settings
+from app.metrics import DB_POOL_CHECKOUT_SECONDS
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waits (db_pool_checkout_seconds)."""
+    engine_label = "sync"
+    # Log as sqlalchemy.pool.* like the stock pools, so the app's INFO level does not apply
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.engine_label).observe(time.perf_counter() - started)
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool, InstrumentedQueuePool):
+    engine_label = "async"
+
+def get_engine_options() -> dict:
+    options = {}
+    if settings.use_null_pool():
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    # A transaction-mode pooler hands each transaction to an arbitrary server connection and
+    # rejects unknown startup parameters, so the timeout is set per transaction instead (see below)
+    if settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def get_async_database_url():
+    """DATABASE_URL with the asyncpg driver; asyncpg takes `ssl` instead of libpq's `sslmode`."""
+    url = make_url(settings.get_database_url()).set(drivername="postgresql+asyncpg")
+    return url.difference_update_query(["sslmode"])
+
+def get_async_engine_options() -> dict:
+    options = get_engine_options()
+    if not settings.use_null_pool():
+        options["poolclass"] = InstrumentedAsyncAdaptedQueuePool
+    connect_args = {}
+
+    sslmode = make_url(settings.get_database_url()).query.get("sslmode")
+    if sslmode:
+        connect_args["ssl"] = sslmode
+    if settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        # asyncpg prepares every statement; behind a transaction-mode pooler the next statement
+        # may land on a server connection that never saw it, so no caching and unique names
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+
+    options["connect_args"] = connect_args
+    return options
+
+def _set_statement_timeout(conn):
+    # SET LOCAL ends with the transaction, so it never leaks to other clients of the pooler
+    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+engine = create_engine(settings.get_database_url(), **get_engine_options())
+
+if settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_PGBOUNCER_TRANSACTION_MODE:
+    event.listen(engine, "begin", _set_statement_timeout)
 
-engine = create_engine(settings.get_database_url())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Opt-in async stack (ASYNC_DB=true): routers run on AsyncSession over asyncpg instead of
+# sync sessions on the threadpool. Only built when enabled, so asyncpg stays optional.
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(get_async_database_url(), **get_async_engine_options())
+    if settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        event.listen(async_engine.sync_engine, "begin", _set_statement_timeout)
+    # Objects stay readable after commit; lazy loads are not possible on an AsyncSession anyway
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -13,3 +104,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
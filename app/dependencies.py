@@ -1,12 +1,19 @@
+import asyncio
+import math
+import time
 from typing import Generator, Annotated
-from fastapi import Depends, HTTPException, status
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app import security
 from app.config import settings
-from app.models import User
+from app.models import AccessLevel, User
+from app.services.rate_limit import rate_limiter
+from app.services.user_cache import token_cache, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -18,6 +25,21 @@ class CredentialsException(HTTPException):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+class ForbiddenException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+class RateLimitExceededException(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
 class EntityNotFoundException(HTTPException):
     def __init__(self, entity_name: str):
         super().__init__(
@@ -25,22 +47,111 @@ class EntityNotFoundException(HTTPException):
             detail=f"{entity_name} not found"
         )
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+def decode_token_subject(token: str) -> UUID:
+    """Returns the user id (`sub`) of a valid access token. Decoded tokens are cached until they expire."""
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+        subject: str = payload.get("sub")
+        if subject is None:
             raise CredentialsException()
-    except JWTError:
+        user_id = UUID(subject)
+    except (JWTError, ValueError):
         raise CredentialsException()
-    
+
+    ttl = settings.USER_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(token, user_id, ttl=ttl)
+    return user_id
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    user_id = decode_token_subject(token)
+    cached = user_cache.get(user_id) if user_cache else None
+    if cached is not None:
+        return db.merge(cached, load=False)
+
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise CredentialsException()
+    if user_cache:
+        user_cache.set(user)
+    return user
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    user_id = decode_token_subject(token)
+    cached = user_cache.get(user_id) if user_cache else None
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    user = await db.get(User, user_id)
+    if user is None:
+        raise CredentialsException()
+    if user_cache:
+        user_cache.set(user)
     return user
 
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.access_level != AccessLevel.ADMIN.value:
+        raise ForbiddenException()
+    return current_user
+
+async def get_current_admin_async(current_user: User = Depends(get_current_user_async)) -> User:
+    if current_user.access_level != AccessLevel.ADMIN.value:
+        raise ForbiddenException()
+    return current_user
+
+def _route_key(request: Request) -> str:
+    return f"{request.method} {request.scope['route'].path}"
+
+def charge_rate_limit(request: Request, user: User, scope: str):
+    """Takes a token from the user's bucket for `scope` on the matched route (see RATE_LIMITS), or raises 429."""
+    if rate_limiter:
+        wait = rate_limiter.check(user.id, user.access_level, scope, _route_key(request))
+        if wait > 0:
+            raise RateLimitExceededException(wait)
+
+async def charge_rate_limit_async(request: Request, user: User, scope: str):
+    if rate_limiter:
+        args = (user.id, user.access_level, scope, _route_key(request))
+        # A shared backend is a network round trip; keep it off the event loop
+        if rate_limiter.backend.shared:
+            wait = await asyncio.to_thread(rate_limiter.check, *args)
+        else:
+            wait = rate_limiter.check(*args)
+        if wait > 0:
+            raise RateLimitExceededException(wait)
+
+def rate_limit(scope: str):
+    """
+    Dependency charging `scope` for every call of a route. The current user is resolved
+    once per request, shared with the endpoint. Endpoints that should only charge some
+    calls use `charge_rate_limit` directly.
+    """
+    def check_rate_limit(request: Request, current_user: User = Depends(get_current_user)):
+        charge_rate_limit(request, current_user, scope)
+    return check_rate_limit
+
+def rate_limit_async(scope: str):
+    async def check_rate_limit(request: Request, current_user: User = Depends(get_current_user_async)):
+        await charge_rate_limit_async(request, current_user, scope)
+    return check_rate_limit
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AdminUser = Annotated[User, Depends(get_current_admin)]
 Database = Annotated[Session, Depends(get_db)]
+
+# ASYNC_DB=true counterparts, used by the routers in app/routers/aio
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+AsyncAdminUser = Annotated[User, Depends(get_current_admin_async)]
+AsyncDatabase = Annotated[AsyncSession, Depends(get_async_db)]
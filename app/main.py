@@ -1,15 +1,21 @@
 import logging
 import os
 import asyncio
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from alembic.config import Config
 from alembic import command
 
+from app.compression import CompressionMiddleware
 from app.config import settings
 from app.api import api_router
+from app.database import SessionLocal, async_engine
+from app.metrics import REQUEST_LATENCY, JobQueueCollector, register_collector, render_metrics
+from app.security import shutdown_hash_executor
+from app.services.jobs import JobService
 
 # Configure Logging
 logging.basicConfig(
@@ -52,6 +58,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down application...")
+    shutdown_hash_executor()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -71,6 +80,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        compresslevel=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger.info(f"--> {request.method} {request.url}")
@@ -82,6 +99,25 @@ async def log_requests(request: Request, call_next):
         logger.error(f"Request failed: {e}", exc_info=True)
         raise e
 
+if settings.METRICS_ENABLED:
+    register_collector(JobQueueCollector(JobService(), SessionLocal))
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        # Label by route template, not URL, so ids do not explode the number of series
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            request.method, route.path if route else "unmatched", str(response.status_code)
+        ).observe(time.perf_counter() - started)
+        return response
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global Exception: {exc}", exc_info=True)
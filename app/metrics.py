@@ -0,0 +1,87 @@
+"""
+Prometheus metrics. The API serves them on GET /metrics and the worker on WORKER_METRICS_PORT.
+
+When the API runs several processes (e.g. `uvicorn --workers 4`), set PROMETHEUS_MULTIPROC_DIR
+to an empty directory shared by them, so /metrics aggregates every process instead of
+reporting whichever one answered the scrape.
+"""
+import logging
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time until the response starts, by route template",
+    ["method", "route", "status"],
+)
+RATE_LIMITED_REQUESTS = Counter("rate_limited_requests_total", "Requests rejected by the rate limiter", ["scope", "tier"])
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time waiting for a pooled connection, opening new ones included",
+    ["engine"], buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30),
+)
+
+_GENERATION_BUCKETS = (.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+PIPELINE_STAGE_SECONDS = Histogram(
+    "generation_stage_duration_seconds", "Wall time of each generation pipeline stage",
+    ["stage"], buckets=_GENERATION_BUCKETS,
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds", "LLM call latency (rate limiter wait included), by stage",
+    ["stage"], buckets=_GENERATION_BUCKETS,
+)
+LLM_REQUESTS = Counter("llm_requests_total", "LLM calls by stage and outcome (ok, cached, error)", ["stage", "outcome"])
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the LLM, by stage and kind (prompt, output)", ["stage", "kind"])
+
+GENERATIONS_IN_PROGRESS = Gauge(
+    "generation_jobs_in_progress", "Generations running in this worker process", multiprocess_mode="livesum",
+)
+GENERATION_FAILURES = Counter("generation_failures_total", "Failed generation attempts, by cause", ["cause"])
+
+class JobQueueCollector:
+    """Fleet-wide queue depth, read from `generation_jobs` at scrape time."""
+    def __init__(self, job_service, session_factory):
+        self.job_service = job_service
+        self.session_factory = session_factory
+
+    def describe(self):
+        # Without it the registry calls collect() on registration, querying the DB at import time
+        yield self._gauge()
+
+    def collect(self):
+        gauge = self._gauge()
+        db = self.session_factory()
+        try:
+            depth = self.job_service.queue_depth(db)
+        except Exception as e:
+            # A failed query leaves out this sample instead of failing the whole scrape
+            logger.error(f"Failed to read the generation queue depth: {e}")
+            depth = {}
+        finally:
+            db.close()
+        for status, count in depth.items():
+            gauge.add_metric([status], count)
+        yield gauge
+
+    def _gauge(self):
+        return GaugeMetricFamily("generation_jobs", "Generation jobs queued or running, across all workers", labels=["status"])
+
+_collectors = []
+
+def register_collector(collector):
+    _collectors.append(collector)
+    REGISTRY.register(collector)
+
+def render_metrics():
+    """Returns (body, content type) for a scrape."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _collectors:
+            registry.register(collector)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,5 +1,8 @@
-from .user import User
+from .user import AccessLevel, User
 from .project import Project, ProjectStatus
 from .onboarding import OnboardingAnswer
 from .plan import BusinessPlan, PlanSectionAnalysis
 from .consulting import ConsultingRequest
+from .job import GenerationJob, GenerationMode, JobStatus
+from .llm_cache import LLMCacheEntry
+from .llm_usage import LLMUsage
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
@@ -7,6 +7,10 @@ from app.database import Base
 
 class ConsultingRequest(Base):
     __tablename__ = "consulting_requests"
+    __table_args__ = (
+        # User lookups and keyset pagination (see app.services.pagination)
+        Index("ix_consulting_requests_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
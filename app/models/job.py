@@ -0,0 +1,62 @@
+import uuid
+import enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship, backref
+from sqlalchemy.sql import func
+from app.database import Base
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class GenerationMode(str, enum.Enum):
+    FULL = "full"
+    DIRTY_SECTIONS = "dirty_sections"
+
+class GenerationJob(Base):
+    """A durable plan-generation job, claimed and executed by `app.worker`."""
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+        Index("ix_generation_jobs_status_user_id_run_after", "status", "user_id", "run_after"),
+        # At most one queued or running job per project (single-flight generation)
+        Index(
+            "uq_generation_jobs_active_project_id", "project_id", unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        Index(
+            "uq_generation_jobs_user_id_idempotency_key", "user_id", "idempotency_key", unique=True,
+            postgresql_where=text("idempotency_key IS NOT NULL"),
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    status = Column(String, nullable=False, default=JobStatus.QUEUED.value)
+    mode = Column(String, nullable=False, default=GenerationMode.FULL.value, server_default=GenerationMode.FULL.value)
+    # Scheduling weight from the user's access level at enqueue time (JOB_PRIORITY_WEIGHTS)
+    priority = Column(Integer, nullable=False, default=1, server_default="1")
+    # Hash of the mode and onboarding answers the job was started with, and the client's Idempotency-Key
+    input_hash = Column(String, nullable=True)
+    idempotency_key = Column(String, nullable=True)
+
+    # Retry bookkeeping
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+
+    # Lease held by the worker currently running the job (visibility timeout)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    project = relationship("app.models.project.Project", backref=backref("generation_jobs", cascade="all, delete-orphan"))
+    user = relationship("app.models.user.User", backref=backref("generation_jobs", cascade="all, delete-orphan"))
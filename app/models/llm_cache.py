@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LLMCacheEntry(Base):
+    """Shared LLM response cache (LLM_CACHE_BACKEND=database), keyed on sha256(model + prompt)."""
+    __tablename__ = "llm_cache_entries"
+
+    key = Column(String(64), primary_key=True)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
@@ -0,0 +1,30 @@
+import uuid
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Boolean, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LLMUsage(Base):
+    """
+    One LLM call made for a plan generation (ledger of token usage).
+
+    Rows outlive the project and user they were made for (the foreign keys are set to
+    NULL on delete), so past usage keeps adding up in the aggregates.
+    """
+    __tablename__ = "llm_usage"
+    __table_args__ = (
+        Index("ix_llm_usage_created_at", "created_at"),
+        Index("ix_llm_usage_user_id_created_at", "user_id", "created_at"),
+        Index("ix_llm_usage_project_id_created_at", "project_id", "created_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="SET NULL"), nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    stage = Column(String, nullable=False)  # plan, plan_section, summary or analysis
+    model = Column(String, nullable=False)
+    prompt_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=False)
+    cached = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
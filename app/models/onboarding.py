@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
@@ -7,6 +7,9 @@ from app.database import Base
 
 class OnboardingAnswer(Base):
     __tablename__ = "onboarding_answers"
+    __table_args__ = (
+        Index("uq_onboarding_answers_project_id_question", "project_id", "question", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
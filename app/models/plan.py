@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, Text, Integer, String
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy import Column, DateTime, ForeignKey, Text, Integer, String, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
 from app.database import Base
@@ -13,10 +13,22 @@ class BusinessPlan(Base):
     
     # Structured fields
     content_markdown = Column(Text, nullable=True)
+    # gzip of content_markdown (PLAN_STORE_COMPRESSED)
+    content_markdown_gzip = Column(LargeBinary, nullable=True)
+    # Full plan being streamed by a generation; replaces content_markdown only once the plan is saved
+    draft_markdown = Column(Text, nullable=True)
     executive_summary = Column(Text, nullable=True)
     overall_score = Column(Integer, nullable=True)
 
+    # Wall time in seconds per pipeline stage of the last generation, e.g. {"plan": 41.2, "summary": 6.8, "total": 48.9}
+    stage_timings = Column(JSONB, nullable=True)
+
+    # Sections whose onboarding answers changed since they were generated
+    dirty_sections = Column(ARRAY(Integer), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every write to the plan or its sections; the plan endpoints' ETag is built from it
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     project = relationship("app.models.project.Project", backref=backref("business_plan", uselist=False, cascade="all, delete-orphan"))
     sections = relationship("PlanSectionAnalysis", back_populates="business_plan", cascade="all, delete-orphan")
@@ -25,7 +37,7 @@ class PlanSectionAnalysis(Base):
     __tablename__ = "plan_section_analyses"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    business_plan_id = Column(UUID(as_uuid=True), ForeignKey("business_plans.id"), nullable=False)
+    business_plan_id = Column(UUID(as_uuid=True), ForeignKey("business_plans.id"), nullable=False, index=True)
     section_name = Column(String, nullable=False)
     score = Column(Integer, nullable=True)
     suggestions = Column(ARRAY(String), nullable=True)
@@ -1,9 +1,15 @@
 import uuid
+import enum
 from sqlalchemy import Column, String, Boolean, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.database import Base
 
+class AccessLevel(str, enum.Enum):
+    FREE = "free"
+    PRO = "pro"
+    ADMIN = "admin"
+
 class User(Base):
     __tablename__ = "users"
 
@@ -12,5 +18,5 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
-    access_level = Column(String, default="free")
+    access_level = Column(String, default=AccessLevel.FREE.value)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from typing import List, Optional
+from datetime import date
+from uuid import UUID
+from app.dependencies import AsyncDatabase, AsyncAdminUser
+from app.schemas import llm_usage as schemas
+from app.services import llm_usage as service
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+usage_service = service.AsyncLLMUsageService()
+
+@router.get("/llm-usage/daily", response_model=List[schemas.DailyUsage])
+async def get_daily_llm_usage(db: AsyncDatabase, admin: AsyncAdminUser, since: Optional[date] = None, until: Optional[date] = None, user_id: Optional[UUID] = None):
+    """LLM calls and tokens per user per UTC day (last 30 days unless `since`/`until` are given)."""
+    return await usage_service.daily_usage(db, since, until, user_id)
+
+@router.get("/llm-usage/stages", response_model=List[schemas.StageUsage])
+async def get_stage_llm_usage(db: AsyncDatabase, admin: AsyncAdminUser, since: Optional[date] = None, until: Optional[date] = None,
+                              user_id: Optional[UUID] = None, project_id: Optional[UUID] = None):
+    """LLM calls and tokens per pipeline stage and model, optionally for one user or project."""
+    return await usage_service.stage_usage(db, since, until, user_id, project_id)
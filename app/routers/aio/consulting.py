@@ -0,0 +1,23 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
+from typing import Optional
+from uuid import UUID
+from app.dependencies import AsyncDatabase, AsyncCurrentUser, rate_limit_async
+from app.schemas import consulting as schemas
+from app.services import consulting as service
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter(prefix="/consulting", tags=["Consulting"], dependencies=[Depends(rate_limit_async("api"))])
+consulting_service = service.AsyncConsultingService()
+
+@router.post("", response_model=schemas.ConsultingRequestResponse)
+async def create_consulting_request(request: schemas.ConsultingRequestCreate, db: AsyncDatabase, current_user: AsyncCurrentUser, background_tasks: BackgroundTasks):
+    return await consulting_service.create_request(db, request, current_user.id, background_tasks)
+
+@router.get("", response_model=schemas.ConsultingRequestPage, response_model_exclude_unset=True)
+async def read_consulting_requests(db: AsyncDatabase, current_user: AsyncCurrentUser, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Consulting requests of the current user, newest first, paginated like GET /projects."""
+    return await consulting_service.get_requests(db, current_user.id, limit, cursor, fields)
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_consulting_request(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser):
+    await consulting_service.delete_request(db, id, current_user.id)
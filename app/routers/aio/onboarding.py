@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Header, Request
+from uuid import UUID
+from typing import List, Optional
+from app.dependencies import AsyncDatabase, AsyncCurrentUser, charge_rate_limit_async, rate_limit_async
+from app.models import GenerationMode
+from app.schemas import onboarding as schemas
+from app.services import onboarding as service
+from app.services.projects import AsyncProjectService
+
+router = APIRouter(tags=["Onboarding"], dependencies=[Depends(rate_limit_async("api"))])
+onboarding_service = service.AsyncOnboardingService()
+project_service = AsyncProjectService()
+
+@router.get("/projects/{id}/onboarding", response_model=List[schemas.OnboardingAnswerResponse])
+async def get_onboarding(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser):
+    """Returns the 10 fixed onboarding answers for a project."""
+    project = await project_service.get_project(db, id, current_user.id)
+    return await onboarding_service.get_answers(db, project)
+
+@router.put("/projects/{id}/onboarding", response_model=List[schemas.OnboardingAnswerResponse])
+async def update_onboarding(id: UUID, payload: List[schemas.OnboardingAnswerCreate], db: AsyncDatabase, current_user: AsyncCurrentUser):
+    """Saves several onboarding answers in one statement and returns them."""
+    project = await project_service.get_project(db, id, current_user.id)
+    return await onboarding_service.update_answers(db, project, payload)
+
+@router.patch("/projects/{id}/onboarding/{question_label}", response_model=schemas.OnboardingAnswerResponse)
+async def update_single_answer(id: UUID, question_label: str, payload: schemas.OnboardingAnswerUpdate, db: AsyncDatabase, current_user: AsyncCurrentUser):
+    """Updates a single onboarding answer by its question label."""
+    await project_service.get_project(db, id, current_user.id)
+    return await onboarding_service.update_single_answer(db, id, question_label, payload.answer)
+
+@router.post("/projects/{id}/complete", response_model=schemas.GenerationStarted)
+async def complete_onboarding(id: UUID, request: Request, db: AsyncDatabase, current_user: AsyncCurrentUser, mode: GenerationMode = GenerationMode.FULL,
+                              idempotency_key: Optional[str] = Header(None, max_length=255)):
+    """
+    Starts plan generation. `mode=dirty_sections` only rewrites the sections (and their
+    analysis) affected by answers changed since the last generation.
+
+    Repeated calls while the project is generating return the running job. Send an
+    `Idempotency-Key` header to make client retries return the job the first call created.
+    Only calls that start a new generation count against the "generation" rate limit.
+    """
+    project = await project_service.get_project(db, id, current_user.id)
+    job = await onboarding_service.complete_onboarding(
+        db, project, mode, current_user.access_level, idempotency_key,
+        before_commit=lambda: charge_rate_limit_async(request, current_user, "generation"),
+    )
+    return {"message": "Plan generation started", "status": "generating", "job_id": job.id}
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from uuid import UUID
+from app.dependencies import AsyncDatabase, AsyncCurrentUser, rate_limit_async
+from app.schemas import plans as schemas
+from app.services import plans as service
+from app.services.projects import AsyncProjectService
+
+router = APIRouter(tags=["Plans"], dependencies=[Depends(rate_limit_async("api"))])
+plan_service = service.AsyncPlanService()
+project_service = AsyncProjectService()
+
+@router.get("/projects/{id}/plan", response_model=schemas.PlanMarkdownResponse)
+async def get_plan_markdown(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser, response: Response, if_none_match: Optional[str] = Header(None)):
+    """
+    Returns only the markdown content of the business plan.
+    Pollers should send the last ETag in If-None-Match: an unchanged plan answers 304 with no body.
+    """
+    if if_none_match:
+        etag = await plan_service.get_owned_plan_etag(db, id, current_user.id)
+        if etag and plan_service.etag_matches(if_none_match, etag):
+            return plan_service.not_modified(etag)
+    plan = await plan_service.get_owned_plan(db, id, current_user.id)
+    plan_service.set_cache_headers(response, plan)
+    return plan
+
+@router.get("/projects/{id}/plan/markdown", response_class=Response, responses={200: {"content": {"text/markdown": {}}}})
+async def get_plan_markdown_text(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser, if_none_match: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
+    """Returns the plan as raw markdown, served from the stored gzip copy when there is one."""
+    gzip_accepted = "gzip" in (accept_encoding or "")
+    if if_none_match:
+        etag = await plan_service.get_owned_markdown_etag(db, id, current_user.id, gzip_accepted)
+        if etag and plan_service.etag_matches(if_none_match, etag):
+            return plan_service.not_modified(etag, vary=plan_service.MARKDOWN_VARY)
+    return await plan_service.get_owned_plan_markdown(db, id, current_user.id, gzip_accepted)
+
+@router.get("/projects/{id}/plan/stream")
+async def stream_plan_markdown(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser, last_event_id: Optional[str] = Header(None)):
+    """Streams the plan markdown as Server-Sent Events while it is being generated."""
+    await project_service.get_project(db, id, current_user.id)
+    # Dependency cleanup only runs after the stream ends, so give the connection back now:
+    # progress is polled with short-lived sessions of its own
+    await db.close()
+    offset = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        plan_service.stream_plan_events(id, offset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/projects/{id}/plan/analysis", response_model=schemas.PlanAnalysisResponse)
+async def get_plan_analysis(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser, response: Response, if_none_match: Optional[str] = Header(None)):
+    """Returns the executive summary, overall score and per-section analysis. Supports If-None-Match like /plan."""
+    if if_none_match:
+        etag = await plan_service.get_owned_plan_etag(db, id, current_user.id)
+        if etag and plan_service.etag_matches(if_none_match, etag):
+            return plan_service.not_modified(etag)
+    plan = await plan_service.get_owned_plan(db, id, current_user.id, with_sections=True)
+    plan_service.set_cache_headers(response, plan)
+    return plan
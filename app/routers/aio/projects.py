@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query, status
+from typing import Optional
+from uuid import UUID
+from app.dependencies import AsyncDatabase, AsyncCurrentUser, rate_limit_async
+from app.schemas import projects as schemas
+from app.services import projects as service
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter(prefix="/projects", tags=["Projects"], dependencies=[Depends(rate_limit_async("api"))])
+project_service = service.AsyncProjectService()
+
+@router.post("", response_model=schemas.ProjectResponse)
+async def create_project(project: schemas.ProjectCreate, db: AsyncDatabase, current_user: AsyncCurrentUser):
+    return await project_service.create_project(db, project, current_user.id)
+
+@router.get("", response_model=schemas.ProjectPage, response_model_exclude_unset=True)
+async def read_projects(db: AsyncDatabase, current_user: AsyncCurrentUser, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None):
+    """
+    The current user's projects, newest first. Pass `next_cursor` back as `cursor` to get
+    the next page (null on the last one); `fields=id,name,status` returns only those fields.
+    """
+    return await project_service.get_projects(db, current_user.id, limit, cursor, fields)
+
+@router.get("/{id}", response_model=schemas.ProjectResponse)
+async def read_project(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser):
+    return await project_service.get_project(db, id, current_user.id)
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project(id: UUID, db: AsyncDatabase, current_user: AsyncCurrentUser):
+    await project_service.delete_project(db, id, current_user.id)
@@ -8,12 +8,12 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 auth_service = service.AuthService()
 
 @router.post("/register", response_model=schemas.UserResponse)
-def register(user: schemas.UserCreate, db: Database, background_tasks: BackgroundTasks):
-    return auth_service.create_user(db, user, background_tasks)
+async def register(user: schemas.UserCreate, db: Database, background_tasks: BackgroundTasks):
+    return await auth_service.create_user(db, user, background_tasks)
 
 @router.post("/login", response_model=schemas.Token)
-def login(db: Database, form_data: OAuth2PasswordRequestForm = Depends()):
-    user = auth_service.authenticate_user(db, form_data.username, form_data.password)
+async def login(db: Database, form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await auth_service.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,7 +29,7 @@ def login(db: Database, form_data: OAuth2PasswordRequestForm = Depends()):
 def read_users_me(current_user: CurrentUser):
     return current_user
 
-@router.post("/forgot-password")
+@router.post("/forgot-password", response_model=schemas.Message)
 def forgot_password(request: schemas.UserPasswordResetRequest, db: Database, background_tasks: BackgroundTasks):
     auth_service.request_password_reset(db, request.email, background_tasks)
     return {"message": "If the email exists, a reset link was sent."}
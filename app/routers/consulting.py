@@ -1,20 +1,22 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
+from typing import Optional
 from uuid import UUID
-from app.dependencies import Database, CurrentUser
+from app.dependencies import Database, CurrentUser, rate_limit
 from app.schemas import consulting as schemas
 from app.services import consulting as service
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
-router = APIRouter(prefix="/consulting", tags=["Consulting"])
+router = APIRouter(prefix="/consulting", tags=["Consulting"], dependencies=[Depends(rate_limit("api"))])
 consulting_service = service.ConsultingService()
 
 @router.post("", response_model=schemas.ConsultingRequestResponse)
-def create_consulting_request(request: schemas.ConsultingRequestCreate, db: Database, current_user: CurrentUser):
-    return consulting_service.create_request(db, request, current_user.id)
+def create_consulting_request(request: schemas.ConsultingRequestCreate, db: Database, current_user: CurrentUser, background_tasks: BackgroundTasks):
+    return consulting_service.create_request(db, request, current_user.id, background_tasks)
 
-@router.get("", response_model=List[schemas.ConsultingRequestResponse])
-def read_consulting_requests(db: Database, current_user: CurrentUser):
-    return consulting_service.get_requests(db, current_user.id)
+@router.get("", response_model=schemas.ConsultingRequestPage, response_model_exclude_unset=True)
+def read_consulting_requests(db: Database, current_user: CurrentUser, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Consulting requests of the current user, newest first, paginated like GET /projects."""
+    return consulting_service.get_requests(db, current_user.id, limit, cursor, fields)
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_consulting_request(id: str, db: Database, current_user: CurrentUser):
@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from uuid import UUID
-from typing import List
-from app.dependencies import Database, CurrentUser
+from typing import List, Optional
+from app.dependencies import Database, CurrentUser, charge_rate_limit, rate_limit
+from app.models import GenerationMode
 from app.schemas import onboarding as schemas
 from app.services import onboarding as service
 from app.services.projects import ProjectService
 
-router = APIRouter(tags=["Onboarding"])
+router = APIRouter(tags=["Onboarding"], dependencies=[Depends(rate_limit("api"))])
 onboarding_service = service.OnboardingService()
 project_service = ProjectService()
 
 @router.get("/projects/{id}/onboarding", response_model=List[schemas.OnboardingAnswerResponse])
 def get_onboarding(id: UUID, db: Database, current_user: CurrentUser):
     """Returns the 10 fixed onboarding answers for a project."""
-    project_service.get_project(db, id, current_user.id)
-    return onboarding_service.get_answers(db, id)
+    project = project_service.get_project(db, id, current_user.id)
+    return onboarding_service.get_answers(db, project)
+
+@router.put("/projects/{id}/onboarding", response_model=List[schemas.OnboardingAnswerResponse])
+def update_onboarding(id: UUID, payload: List[schemas.OnboardingAnswerCreate], db: Database, current_user: CurrentUser):
+    """Saves several onboarding answers in one statement and returns them."""
+    project = project_service.get_project(db, id, current_user.id)
+    return onboarding_service.update_answers(db, project, payload)
 
 @router.patch("/projects/{id}/onboarding/{question_label}", response_model=schemas.OnboardingAnswerResponse)
 def update_single_answer(id: UUID, question_label: str, payload: schemas.OnboardingAnswerUpdate, db: Database, current_user: CurrentUser):
@@ -22,9 +29,21 @@ def update_single_answer(id: UUID, question_label: str, payload: schemas.Onboard
     project_service.get_project(db, id, current_user.id)
     return onboarding_service.update_single_answer(db, id, question_label, payload.answer)
 
-@router.post("/projects/{id}/complete")
-def complete_onboarding(id: UUID, db: Database, current_user: CurrentUser, background_tasks: BackgroundTasks):
-    project_service.get_project(db, id, current_user.id)
-    onboarding_service.complete_onboarding(db, id, background_tasks)
-    return {"message": "Plan generation started", "status": "generating"}
+@router.post("/projects/{id}/complete", response_model=schemas.GenerationStarted)
+def complete_onboarding(id: UUID, request: Request, db: Database, current_user: CurrentUser, mode: GenerationMode = GenerationMode.FULL,
+                        idempotency_key: Optional[str] = Header(None, max_length=255)):
+    """
+    Starts plan generation. `mode=dirty_sections` only rewrites the sections (and their
+    analysis) affected by answers changed since the last generation.
+
+    Repeated calls while the project is generating return the running job. Send an
+    `Idempotency-Key` header to make client retries return the job the first call created.
+    Only calls that start a new generation count against the "generation" rate limit.
+    """
+    project = project_service.get_project(db, id, current_user.id)
+    job = onboarding_service.complete_onboarding(
+        db, project, mode, current_user.access_level, idempotency_key,
+        before_commit=lambda: charge_rate_limit(request, current_user, "generation"),
+    )
+    return {"message": "Plan generation started", "status": "generating", "job_id": job.id}
 
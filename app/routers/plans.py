@@ -1,22 +1,61 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from uuid import UUID
-from app.dependencies import Database, CurrentUser
+from app.dependencies import Database, CurrentUser, rate_limit
 from app.schemas import plans as schemas
 from app.services import plans as service
 from app.services.projects import ProjectService
 
-router = APIRouter(tags=["Plans"])
+router = APIRouter(tags=["Plans"], dependencies=[Depends(rate_limit("api"))])
 plan_service = service.PlanService()
 project_service = ProjectService()
 
 @router.get("/projects/{id}/plan", response_model=schemas.PlanMarkdownResponse)
-def get_plan_markdown(id: UUID, db: Database, current_user: CurrentUser):
-    """Returns only the markdown content of the business plan."""
+def get_plan_markdown(id: UUID, db: Database, current_user: CurrentUser, response: Response, if_none_match: Optional[str] = Header(None)):
+    """
+    Returns only the markdown content of the business plan.
+    Pollers should send the last ETag in If-None-Match: an unchanged plan answers 304 with no body.
+    """
+    if if_none_match:
+        etag = plan_service.get_owned_plan_etag(db, id, current_user.id)
+        if etag and plan_service.etag_matches(if_none_match, etag):
+            return plan_service.not_modified(etag)
+    plan = plan_service.get_owned_plan(db, id, current_user.id)
+    plan_service.set_cache_headers(response, plan)
+    return plan
+
+@router.get("/projects/{id}/plan/markdown", response_class=Response, responses={200: {"content": {"text/markdown": {}}}})
+def get_plan_markdown_text(id: UUID, db: Database, current_user: CurrentUser, if_none_match: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
+    """Returns the plan as raw markdown, served from the stored gzip copy when there is one."""
+    gzip_accepted = "gzip" in (accept_encoding or "")
+    if if_none_match:
+        etag = plan_service.get_owned_markdown_etag(db, id, current_user.id, gzip_accepted)
+        if etag and plan_service.etag_matches(if_none_match, etag):
+            return plan_service.not_modified(etag, vary=plan_service.MARKDOWN_VARY)
+    return plan_service.get_owned_plan_markdown(db, id, current_user.id, gzip_accepted)
+
+@router.get("/projects/{id}/plan/stream")
+def stream_plan_markdown(id: UUID, db: Database, current_user: CurrentUser, last_event_id: Optional[str] = Header(None)):
+    """Streams the plan markdown as Server-Sent Events while it is being generated."""
     project_service.get_project(db, id, current_user.id)
-    return plan_service.get_plan_by_project(db, id)
+    # Dependency cleanup only runs after the stream ends, so give the connection back now:
+    # progress is polled with short-lived sessions of its own
+    db.close()
+    offset = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        plan_service.stream_plan_events(id, offset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/projects/{id}/plan/analysis", response_model=schemas.PlanAnalysisResponse)
-def get_plan_analysis(id: UUID, db: Database, current_user: CurrentUser):
-    """Returns the executive summary, overall score and per-section analysis."""
-    project_service.get_project(db, id, current_user.id)
-    return plan_service.get_plan_by_project(db, id)
+def get_plan_analysis(id: UUID, db: Database, current_user: CurrentUser, response: Response, if_none_match: Optional[str] = Header(None)):
+    """Returns the executive summary, overall score and per-section analysis. Supports If-None-Match like /plan."""
+    if if_none_match:
+        etag = plan_service.get_owned_plan_etag(db, id, current_user.id)
+        if etag and plan_service.etag_matches(if_none_match, etag):
+            return plan_service.not_modified(etag)
+    plan = plan_service.get_owned_plan(db, id, current_user.id, with_sections=True)
+    plan_service.set_cache_headers(response, plan)
+    return plan
@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
+from fastapi import APIRouter, Depends, Query, status
+from typing import Optional
 from uuid import UUID
-from app.dependencies import Database, CurrentUser
+from app.dependencies import Database, CurrentUser, rate_limit
 from app.schemas import projects as schemas
 from app.services import projects as service
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
-router = APIRouter(prefix="/projects", tags=["Projects"])
+router = APIRouter(prefix="/projects", tags=["Projects"], dependencies=[Depends(rate_limit("api"))])
 project_service = service.ProjectService()
 
 @router.post("", response_model=schemas.ProjectResponse)
 def create_project(project: schemas.ProjectCreate, db: Database, current_user: CurrentUser):
     return project_service.create_project(db, project, current_user.id)
 
-@router.get("", response_model=List[schemas.ProjectResponse])
-def read_projects(db: Database, current_user: CurrentUser):
-    return project_service.get_projects(db, current_user.id)
+@router.get("", response_model=schemas.ProjectPage, response_model_exclude_unset=True)
+def read_projects(db: Database, current_user: CurrentUser, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None):
+    """
+    The current user's projects, newest first. Pass `next_cursor` back as `cursor` to get
+    the next page (null on the last one); `fields=id,name,status` returns only those fields.
+    """
+    return project_service.get_projects(db, current_user.id, limit, cursor, fields)
 
 @router.get("/{id}", response_model=schemas.ProjectResponse)
 def read_project(id: UUID, db: Database, current_user: CurrentUser):
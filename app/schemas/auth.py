@@ -26,3 +26,6 @@ class TokenData(BaseModel):
 
 class UserPasswordResetRequest(BaseModel):
     email: EmailStr
+
+class Message(BaseModel):
+    message: str
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, UUID4
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class ConsultingRequestBase(BaseModel):
     project_id: UUID4
@@ -19,3 +19,18 @@ class ConsultingRequestResponse(ConsultingRequestBase):
 
     class Config:
         from_attributes = True
+
+class ConsultingRequestListItem(BaseModel):
+    """A ConsultingRequestResponse where only the fields requested with `fields=` are present."""
+    id: Optional[UUID4] = None
+    user_id: Optional[UUID4] = None
+    project_id: Optional[UUID4] = None
+    type: Optional[str] = None
+    objective: Optional[str] = None
+    status: Optional[str] = None
+    meeting_link: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class ConsultingRequestPage(BaseModel):
+    items: List[ConsultingRequestListItem]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, UUID4
+from typing import Optional
+from datetime import date
+
+class UsageTotals(BaseModel):
+    calls: int
+    cached_calls: int
+    prompt_tokens: int
+    output_tokens: int
+    avg_latency_ms: float  # calls that reached the model; cache hits excluded
+
+class DailyUsage(UsageTotals):
+    """LLM usage of one user on one UTC day. `user_id` is null for deleted users."""
+    user_id: Optional[UUID4]
+    day: date
+
+class StageUsage(UsageTotals):
+    """LLM usage of one pipeline stage (plan, plan_section, summary, analysis) and model."""
+    stage: str
+    model: str
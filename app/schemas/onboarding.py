@@ -15,6 +15,11 @@ class OnboardingAnswerResponse(OnboardingAnswerCreate):
     class Config:
         from_attributes = True
 
+class GenerationStarted(BaseModel):
+    message: str
+    status: str
+    job_id: UUID4
+
 class OnboardingCompletion(BaseModel):
     success: bool
     message: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models import ProjectStatus
 
@@ -27,3 +27,18 @@ class ProjectResponse(ProjectBase):
 
     class Config:
         from_attributes = True
+
+class ProjectListItem(BaseModel):
+    """A ProjectResponse where only the fields requested with `fields=` are present."""
+    id: Optional[UUID4] = None
+    user_id: Optional[UUID4] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    main_sector: Optional[str] = None
+    business_model: Optional[str] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class ProjectPage(BaseModel):
+    items: List[ProjectListItem]
+    next_cursor: Optional[str] = None
@@ -1,24 +1,83 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt
 from app.config import settings
+import asyncio
 import hashlib
+import multiprocessing
+import threading
 import bcrypt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica se a senha em texto plano corresponde ao hash."""
-    # O hash no banco pode estar em string, bcrypt precisa de bytes
-    if isinstance(hashed_password, str):
-        hashed_password = hashed_password.encode('utf-8')
-    
-    pwd_bytes = _prepare_password(plain_password)
-    return bcrypt.checkpw(pwd_bytes, hashed_password)
+    """Verifica se a senha em texto plano corresponde ao hash (bloqueia a thread atual)."""
+    return bcrypt.checkpw(_prepare_password(plain_password), _hash_bytes(hashed_password))
 
 def get_password_hash(password: str) -> str:
-    """Gera o hash da senha usando bcrypt. Trata senhas longas."""
+    """Gera o hash da senha usando bcrypt (custo BCRYPT_ROUNDS). Trata senhas longas."""
     pwd_bytes = _prepare_password(password)
     # Gera o salt e o hash
-    return bcrypt.hashpw(pwd_bytes, bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(pwd_bytes, bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password sem bloquear o event loop."""
+    return await _run_hash_async(bcrypt.checkpw, _prepare_password(plain_password), _hash_bytes(hashed_password))
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash sem bloquear o event loop."""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return (await _run_hash_async(bcrypt.hashpw, _prepare_password(password), salt)).decode('utf-8')
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True se o hash foi gerado com um custo diferente de BCRYPT_ROUNDS."""
+    try:
+        # Formato: $2b$<custo>$<salt+hash>
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+# bcrypt is pure CPU (~250ms at cost 12). The async wrappers, used by /auth/login and
+# /auth/register on both stacks, run it in a dedicated process pool so a burst of logins
+# neither stalls the event loop nor occupies the request threadpool. The sync functions
+# above hash in the calling thread: pyca bcrypt releases the GIL, and blocking on a pool
+# future would hold the thread just the same. Without a pool (PASSWORD_HASH_PROCESSES=0,
+# or on Vercel) the async wrappers use a worker thread.
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
+def _get_hash_executor() -> Optional[ProcessPoolExecutor]:
+    global _hash_executor
+    processes = settings.get_password_hash_processes()
+    if processes == 0:
+        return None
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            # spawn: forking a process that already runs threads is unsafe. Only bcrypt's own
+            # functions are sent over, so the children never import the app.
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_executor
+
+def shutdown_hash_executor():
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False, cancel_futures=True)
+            _hash_executor = None
+
+async def _run_hash_async(fn, *args):
+    executor = _get_hash_executor()
+    if executor is None:
+        return await asyncio.to_thread(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+def _hash_bytes(hashed_password) -> bytes:
+    # O hash no banco pode estar em string, bcrypt precisa de bytes
+    if isinstance(hashed_password, str):
+        return hashed_password.encode('utf-8')
+    return hashed_password
 
 def _prepare_password(password: str) -> bytes:
     """Prepara a senha para o bcrypt (limite de 72 bytes)."""
@@ -1,34 +1,152 @@
-from google import genai
+import asyncio
+import json
+import re
+import time
+from typing import AsyncIterator, Dict, Iterable
 from app.config import settings
+from app.metrics import LLM_REQUEST_SECONDS, LLM_REQUESTS, LLM_TOKENS
+from app.services.llm import LLMNotConfiguredError, LLMResponse, get_llm_backend
+from app.services.llm_cache import llm_cache
+from app.services.llm_limiter import llm_limiter
+from app.services.llm_usage import record_llm_usage
+from app.services.plan_sections import ANALYZED_SECTION_NUMBERS, PLAN_SECTIONS, SECTION_NUMBERS, PlanSection, get_section
 
 class AIGeneratorService:
+    """
+    Prompts and calls for each generation stage, used by the generation pipeline.
+    Every call goes through the process-wide `llm_limiter`; successful responses are
+    stored in `llm_cache`, so repeating a prompt is free.
+
+    LLM errors are raised (and LLMNotConfiguredError without a backend), so the job queue
+    retries the generation instead of saving an error message as the plan.
+    """
     def __init__(self):
-        self.api_key = settings.GEMINI_API_KEY
-        if self.api_key:
-            self.client = genai.Client(api_key=self.api_key)
-        else:
-            self.client = None
-
-    def generate_business_plan(self, data: dict) -> str:
-        if not self.client:
-            return "# Plan Generation Failed\n\nGemini API Key is not configured."
+        self.model = settings.LLM_MODEL
+        self.backend = get_llm_backend()
+        self.cache = llm_cache
 
+    async def stream_business_plan(self, data: dict) -> AsyncIterator[str]:
+        """Generates the full plan in one LLM call, yielding the markdown as it is generated."""
+        self._require_backend()
         prompt = self._create_business_plan_prompt(data)
-        
+
+        started = time.perf_counter()
+        cached = await asyncio.to_thread(self._cache_get, prompt)
+        if cached is not None:
+            self._record("plan", started, LLMResponse(text=cached, cached=True))
+            yield cached
+            return
+
+        started = time.perf_counter()
+        try:
+            parts = []
+            usage = LLMResponse(text="")
+            async with llm_limiter:
+                async for chunk in self.backend.astream(self.model, prompt):
+                    parts.append(chunk.text)
+                    # Usage arrives with the last chunk
+                    usage.prompt_tokens = chunk.prompt_tokens or usage.prompt_tokens
+                    usage.output_tokens = chunk.output_tokens or usage.output_tokens
+                    yield chunk.text
+        except Exception:
+            self._record("plan", started)
+            raise
+        self._record("plan", started, usage)
+        await asyncio.to_thread(self._cache_set, prompt, "".join(parts))
+
+    async def generate_plan_section_async(self, data: dict, number: int) -> str:
+        """Generates a single top-level section (e.g. 7 -> "# 7. Plano Financeiro")."""
+        self._require_backend()
+        prompt = self._create_plan_section_prompt(data, get_section(number))
+        return (await self._agenerate(prompt, "plan_section")).text.strip()
+
+    async def generate_plan_sections_async(self, data: dict, numbers: Iterable[int] = None) -> Dict[int, str]:
+        """Generates the given sections (all by default) concurrently, one LLM call each."""
+        numbers = list(numbers) if numbers is not None else SECTION_NUMBERS
+        texts = await asyncio.gather(*(self.generate_plan_section_async(data, number) for number in numbers))
+        return dict(zip(numbers, texts))
+
+    async def generate_executive_summary_async(self, plan_markdown: str) -> str:
+        self._require_backend()
+        prompt = self._create_executive_summary_prompt(plan_markdown)
+        return (await self._agenerate(prompt, "summary")).text
+
+    async def generate_advanced_analysis_async(self, plan_markdown: str, numbers: Iterable[int] = None) -> dict:
+        """Scores the plan sections; `numbers` restricts the evaluation to some of them."""
+        self._require_backend()
+        prompt = self._create_advanced_analysis_prompt(plan_markdown, numbers)
+        text = (await self._agenerate(prompt, "analysis")).text
+        try:
+            return self._parse_advanced_analysis(text)
+        except ValueError:
+            # Do not keep serving a response we could not parse; the retry asks again
+            await asyncio.to_thread(self._evict, prompt)
+            raise
+
+    def _require_backend(self):
+        if not self.backend:
+            raise LLMNotConfiguredError("No LLM backend configured: set GEMINI_API_KEY or LLM_BACKEND=fake")
+
+    async def _agenerate(self, prompt: str, stage: str) -> LLMResponse:
+        # Cache hits skip the limiter: they cost no quota
+        started = time.perf_counter()
+        cached = await asyncio.to_thread(self._cache_get, prompt)
+        if cached is not None:
+            response = LLMResponse(text=cached, cached=True)
+            self._record(stage, started, response)
+            return response
+        started = time.perf_counter()
         try:
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt
-            )
-            return response.text
-        except Exception as e:
-             return f"# Plan Generation Error\n\nAn error occurred while communicating with AI: {str(e)}"
-
-    def generate_executive_summary(self, plan_markdown: str) -> str:
-        if not self.client:
-            return "Resumo indisponível (API Key não configurada)."
-            
-        prompt = f"""
+            async with llm_limiter:
+                response = await self.backend.agenerate(self.model, prompt)
+        except Exception:
+            self._record(stage, started)
+            raise
+        self._record(stage, started, response)
+        await asyncio.to_thread(self._cache_set, prompt, response.text)
+        return response
+
+    def _record(self, stage: str, started: float, response: LLMResponse = None):
+        """
+        Metrics of one LLM call (no response means it failed) and, during a generation,
+        its entry in the token usage ledger.
+        """
+        latency = time.perf_counter() - started
+        if response is None:
+            LLM_REQUEST_SECONDS.labels(stage).observe(latency)
+            LLM_REQUESTS.labels(stage, "error").inc()
+            return
+        record_llm_usage(stage, self.model, response, latency)
+        if response.cached:
+            LLM_REQUESTS.labels(stage, "cached").inc()
+            return
+        LLM_REQUEST_SECONDS.labels(stage).observe(latency)
+        LLM_REQUESTS.labels(stage, "ok").inc()
+        if response.prompt_tokens:
+            LLM_TOKENS.labels(stage, "prompt").inc(response.prompt_tokens)
+        if response.output_tokens:
+            LLM_TOKENS.labels(stage, "output").inc(response.output_tokens)
+
+    def _cache_get(self, prompt: str):
+        return self.cache.get(self.model, prompt) if self.cache else None
+
+    def _cache_set(self, prompt: str, text: str):
+        if self.cache and text:
+            self.cache.set(self.model, prompt, text)
+
+    def _evict(self, prompt: str):
+        if self.cache:
+            self.cache.delete(self.model, prompt)
+
+    def _parse_advanced_analysis(self, text: str) -> dict:
+        # Remove markdown JSON blocks if present
+        text = re.sub(r'```json\n?', '', text)
+        text = re.sub(r'```\n?', '', text)
+        
+        return json.loads(text.strip())
+
+    def _create_executive_summary_prompt(self, plan_markdown: str) -> str:
+        return f"""
 Você é um Consultor Sênior. 
 
 ####################################################################
@@ -50,33 +168,16 @@ O resumo não deve ter mais do que 3 parágrafos.
 PLANO DE NEGÓCIOS:
 {plan_markdown}
 """
-        try:
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt
-            )
-            return response.text
-        except Exception as e:
-             return f"Erro ao gerar resumo: {str(e)}"
-
-    def generate_advanced_analysis(self, plan_markdown: str) -> dict:
-        if not self.client:
-            return {}
-            
-        prompt = f"""
+
+    def _create_advanced_analysis_prompt(self, plan_markdown: str, numbers: Iterable[int] = None) -> str:
+        numbers = list(numbers) if numbers is not None else ANALYZED_SECTION_NUMBERS
+        section_list = "\n".join(f"{number}. {get_section(number).title}" for number in numbers)
+        return f"""
 Você é um Avaliador de Planos de Negócios e Investidor Anjo Criterioso.
-Avalie rigorosamente as 9 seções estratégicas do plano de negócios abaixo. Para cada seção, forneça uma nota de 0 a 100 (representando quão completo, realista e bem estruturado está) e dê de 1 a 2 sugestões práticas de melhoria.
+Avalie rigorosamente as {len(numbers)} seções estratégicas do plano de negócios abaixo. Para cada seção, forneça uma nota de 0 a 100 (representando quão completo, realista e bem estruturado está) e dê de 1 a 2 sugestões práticas de melhoria.
 
 As seções a avaliar obrigatoriamente são:
-1. Resumo Executivo
-2. Análise de Mercado
-3. Produto e Solução
-4. Modelo de Negócio
-5. Operações e Equipe
-6. Planejamento Estratégico
-7. Plano Financeiro
-8. Sustentabilidade e ESG
-9. Riscos e Mitigações
+{section_list}
 
 Responda ESTRITAMENTE em formato JSON Válido, seguindo exatamente esta estrutura:
 {{
@@ -89,29 +190,14 @@ Responda ESTRITAMENTE em formato JSON Válido, seguindo exatamente esta estrutur
     }}
   ]
 }}
-Lembre-se de retornar as 9 seções dentro de sections_analysis.
+Lembre-se de retornar as {len(numbers)} seções dentro de sections_analysis.
 
 PLANO DE NEGÓCIOS:
 {plan_markdown}
 """
-        try:
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt
-            )
-            import json
-            import re
-            
-            text = response.text
-            # Remove markdown JSON blocks if present
-            text = re.sub(r'```json\n?', '', text)
-            text = re.sub(r'```\n?', '', text)
-            
-            return json.loads(text.strip())
-        except Exception as e:
-             return {"error": str(e)}
 
-    def _create_business_plan_prompt(self, data: dict) -> str:
+    def _create_plan_context(self, data: dict) -> str:
+        """Startup data and general writing rules, shared by the full-plan and per-section prompts."""
         return f"""
 Você é um Consultor Sênior de Estratégia, Inovação e Startups. 
 Sua missão é gerar um **PLANO DE NEGÓCIOS COMPLETO**, sólido, coerente, com análise profunda e estilo profissional, baseado nos dados fornecidos abaixo.
@@ -146,7 +232,11 @@ Respostas adicionais (Onboarding):
 6. Gere um plano completo, sem comentários fora do texto final.  
 7. Retorne **somente** o plano em markdown, nada mais.  
 8. **Não inclua nenhuma instrução, texto entre asteriscos ou explicações internas.**
+"""
 
+    def _create_business_plan_prompt(self, data: dict) -> str:
+        structure = "\n---\n\n".join(section.template for section in PLAN_SECTIONS)
+        return self._create_plan_context(data) + f"""
 ####################################################################
 ### ESTRUTURA OBRIGATÓRIA — COM DESCRIÇÕES (ESTILO PDF)
 ####################################################################
@@ -156,185 +246,33 @@ As descrições servem para orientar como cada seção deve ser escrita.
 
 ---
 
-# 1. Resumo Executivo
-Resumo geral da startup, sintetizando problema, solução, proposta de valor, público-alvo, modelo de negócio e diferenciais.
-
-## 1.1 Apresentação da Startup  
-Caracterização clara da empresa, propósito, setor e proposta principal.
-
-## 1.2 Problema e Oportunidade  
-Descrição da dor ou necessidade do mercado e o potencial da oportunidade identificada.
-
-## 1.3 Proposta de Valor  
-Benefício central entregue ao cliente e resultado gerado.
-
-## 1.4 Modelo de Negócio  
-Como a empresa cria, entrega e captura valor.
-
-## 1.5 Diferenciais Competitivos  
-Vantagens únicas, barreiras à entrada e diferenciação no setor.
-
----
-
-# 2. Análise de Mercado
-Avaliação do ambiente de atuação, incluindo tamanho do mercado, tendências, comportamento do consumidor e competitividade.
-
-## 2.1 Panorama do Setor  
-Contexto geral, relevância econômica e características essenciais.
-
-## 2.2 Tendências Relevantes  
-Movimentos tecnológicos, sociais e econômicos que influenciam o setor.
-
-## 2.3 Segmentação e Público-Alvo  
-Identificação dos grupos de clientes e definição do público prioritário.
-
-## 2.4 Comportamento do Cliente  
-Fatores culturais, sociais e psicológicos que afetam decisões de compra.
-
-## 2.5 Mapeamento da Concorrência  
-Concorrentes diretos e indiretos, comparações e análise competitiva.
-
-## 2.6 Oportunidades de Mercado  
-Lacunas, nichos e tendências que a startup pode aproveitar.
-
----
-
-# 3. Produto e Solução
-Descrição completa do produto/serviço, estágio, funcionalidade e inovação.
-
-## 3.1 O Problema  
-A dor real do mercado e suas implicações.
-
-## 3.2 A Solução Proposta  
-Descrição prática da solução e funcionamento.
-
-## 3.3 Estágio de Desenvolvimento  
-Ideia, protótipo, MVP, beta ou operação.
-
-## 3.4 Funcionalidades-Chave  
-Principais recursos que compõem a solução.
-
-## 3.5 Inovação e Diferenciais  
-Elementos de inovação e impacto positivo frente à concorrência.
-
----
-
-# 4. Modelo de Negócio
-Explicação clara da lógica de funcionamento, monetização e canais.
-
-## 4.1 Estrutura de Monetização  
-Como a startup gera receita.
-
-## 4.2 Canais de Aquisição e Distribuição  
-Canais digitais, vendas diretas, parceiros, etc.
-
-## 4.3 Relacionamento com Clientes  
-Suporte, atendimento, experiência e fidelização.
-
-## 4.4 Estratégia de Crescimento (Go-to-Market)  
-Como a empresa entra no mercado e escala.
-
----
-
-# 5. Operações e Equipe
-Estrutura, papéis, processos operacionais e futuras contratações.
-
-## 5.1 Estrutura Organizacional  
-Organograma, níveis e especializações.
-
-## 5.2 Papéis e Responsabilidades  
-Competências e contribuições de cada membro.
-
-## 5.3 Processos Operacionais  
-Fluxo de desenvolvimento, entrega e manutenção.
-
-## 5.4 Plano de Expansão da Equipe  
-Contratações futuras conforme crescimento.
-
----
-
-# 6. Planejamento Estratégico
-Ferramentas para orientar decisões e posicionamento.
-
-## 6.1 Análise SWOT  
-Forças, fraquezas, oportunidades e ameaças.
-
-## 6.2 Análise PESTEL  
-Fatores Políticos, Econômicos, Sociais, Tecnológicos, Ecológicos e Legais.
-
-## 6.3 Direcionadores Estratégicos  
-Prioridades, metas e visão de longo prazo.
-
-## 6.4 Roadmap de Desenvolvimento  
-Plano para 12, 24 e 36 meses, incluindo marcos.
-
+{structure}
 ---
 
-# 7. Plano Financeiro
-Demonstrações, projeções e viabilidade econômica.
-
-## 7.1 Estrutura de Custos  
-Custos fixos, variáveis e operacionais.
-
-## 7.2 Premissas Financeiras  
-Principais critérios usados nas projeções.
-
-## 7.3 Projeção de Receitas  
-Estimativa de faturamento.
-
-## 7.4 Projeção de Despesas  
-Estimativa de gastos e investimentos operacionais.
-
-## 7.5 Ponto de Equilíbrio  
-Quando a empresa cobre seus custos.
-
-## 7.6 Rentabilidade Estimada  
-ROI, margem e potencial de retorno.
-
-## 7.7 Necessidade de Investimentos e Uso dos Recursos  
-Montante necessário e alocação planejada.
-
----
-
-# 8. Sustentabilidade e ESG
-Impactos ambientais, sociais e práticas de governança.
-
-## 8.1 Impacto Ambiental  
-Sustentabilidade, pegada ecológica e práticas verdes.
-
-## 8.2 Impacto Social  
-Acessibilidade, impacto humano e benefícios sociais.
-
-## 8.3 Governança e Conformidade  
-Ética, transparência e compliance.
-
----
-
-# 9. Riscos e Mitigações
-Identificação de riscos e estratégias de mitigação.
-
-## 9.1 Riscos de Mercado  
-Variações do setor, demanda e concorrência.
+####################################################################
+### FINALIZAÇÃO
+####################################################################
 
-## 9.2 Riscos Operacionais  
-Falhas internas, fornecedores e processos.
+Retorne **APENAS o plano de negócios completo em Markdown**, sem comentários extras, explicações técnicas ou texto fora do conteúdo.
+"""
 
-## 9.3 Riscos Tecnológicos  
-Obsolescência e segurança cibernética.
+    def _create_plan_section_prompt(self, data: dict, section: PlanSection) -> str:
+        return self._create_plan_context(data) + f"""
+####################################################################
+### SEÇÃO A SER ESCRITA
+####################################################################
 
-## 9.4 Estratégias de Mitigação  
-Como reduzir impactos e probabilidades.
+Este plano está sendo escrito por partes. Nesta etapa, escreva **SOMENTE** a seção abaixo, seguindo exatamente sua estrutura e descrições.
+As demais seções são escritas separadamente — não as inclua nem as antecipe.
 
 ---
 
-# 10. Conclusão e Pitch Final
-Resumo final, reforço do propósito e mini-pitch de até 6 linhas, convincente e pronto para investidores.
-
+{section.template}
 ---
 
 ####################################################################
 ### FINALIZAÇÃO
 ####################################################################
 
-Retorne **APENAS o plano de negócios completo em Markdown**, sem comentários extras, explicações técnicas ou texto fora do conteúdo.
+Retorne **APENAS esta seção em Markdown**, começando pelo título "# {section.number}. {section.title}", sem comentários extras, explicações técnicas ou texto fora do conteúdo.
 """
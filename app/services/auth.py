@@ -1,23 +1,39 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import User
 from app.schemas.auth import UserCreate
-from app.security import get_password_hash, verify_password, create_access_token
+from app.security import create_access_token, get_password_hash_async, password_needs_rehash, verify_password_async
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from datetime import timedelta
 from app.email import email_service
+from app.services.user_cache import invalidate_user
 from fastapi import BackgroundTasks
 
 class AuthService:
+    """
+    Auth on a sync Session. Registration and login are coroutines: their queries run in the
+    threadpool and bcrypt is awaited, so no request thread waits through a hash.
+    """
     def get_user_by_email(self, db: Session, email: str):
         return db.query(User).filter(User.email == email).first()
 
-    def create_user(self, db: Session, user: UserCreate, background_tasks: BackgroundTasks):
-        if self.get_user_by_email(db, user.email):
+    async def create_user(self, db: Session, user: UserCreate, background_tasks: BackgroundTasks):
+        if await run_in_threadpool(self.get_user_by_email, db, user.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await get_password_hash_async(user.password)
+        db_user = await run_in_threadpool(self._add_user, db, user, hashed_password)
+
+        # Send Welcome Email
+        email_service.send_welcome_email(background_tasks, db_user.email, db_user.name)
+
+        return db_user
+
+    def _add_user(self, db: Session, user: UserCreate, hashed_password: str) -> User:
         db_user = User(
             email=user.email,
             name=user.name,
@@ -26,16 +42,16 @@ class AuthService:
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
-        
-        # Send Welcome Email
-        email_service.send_welcome_email(background_tasks, db_user.email, db_user.name)
-        
         return db_user
 
-    def authenticate_user(self, db: Session, email: str, password: str):
-        user = self.get_user_by_email(db, email)
-        if not user or not verify_password(password, user.password_hash):
+    async def authenticate_user(self, db: Session, email: str, password: str):
+        user = await run_in_threadpool(self.get_user_by_email, db, email)
+        if not user or not await verify_password_async(password, user.password_hash):
             return None
+        if password_needs_rehash(user.password_hash):
+            # Only now do we have the plain password, so this is where BCRYPT_ROUNDS changes land
+            user.password_hash = await get_password_hash_async(password)
+            await run_in_threadpool(db.commit)
         return user
 
     def request_password_reset(self, db: Session, email: str, background_tasks: BackgroundTasks):
@@ -49,5 +65,58 @@ class AuthService:
         """Delete a user and all associated data."""
         # SQLAlchemy cascade="all, delete-orphan" on relationships should handle children.
         # But we ensure we are deleting the object attached to the session.
+        user_id = user.id
         db.delete(user)
         db.commit()
+        invalidate_user(user_id)
+
+
+class AsyncAuthService:
+    """AuthService on an AsyncSession (ASYNC_DB=true). bcrypt runs off the event loop."""
+
+    async def get_user_by_email(self, db: AsyncSession, email: str):
+        return await db.scalar(select(User).where(User.email == email))
+
+    async def create_user(self, db: AsyncSession, user: UserCreate, background_tasks: BackgroundTasks):
+        if await self.get_user_by_email(db, user.email):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+        hashed_password = await get_password_hash_async(user.password)
+        db_user = User(
+            email=user.email,
+            name=user.name,
+            password_hash=hashed_password
+        )
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+
+        # Send Welcome Email
+        email_service.send_welcome_email(background_tasks, db_user.email, db_user.name)
+
+        return db_user
+
+    async def authenticate_user(self, db: AsyncSession, email: str, password: str):
+        user = await self.get_user_by_email(db, email)
+        if not user or not await verify_password_async(password, user.password_hash):
+            return None
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = await get_password_hash_async(password)
+            await db.commit()
+        return user
+
+    async def request_password_reset(self, db: AsyncSession, email: str, background_tasks: BackgroundTasks):
+        user = await self.get_user_by_email(db, email)
+        if user:
+            # Generate fake token (simulation)
+            token = "dummy-reset-token-123"
+            email_service.send_password_reset_email(background_tasks, user.email, token)
+
+    async def delete_user(self, db: AsyncSession, user: User):
+        """Delete a user and all associated data (relationship cascades)."""
+        user_id = user.id
+        await db.delete(user)
+        await db.commit()
+        invalidate_user(user_id)
@@ -1,35 +1,265 @@
+import asyncio
 import logging
+import time
+from typing import AsyncIterator, Optional
 from uuid import UUID
-from fastapi import BackgroundTasks
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql import func
+from app.compression import gzip_bytes
+from app.config import settings
 from app.database import SessionLocal
-from app.models import BusinessPlan, Project, ProjectStatus, OnboardingAnswer
+from app.models import BusinessPlan, GenerationMode, PlanSectionAnalysis, Project, ProjectStatus, OnboardingAnswer
 from app.services.ai_generator import AIGeneratorService
+from app.services.llm_usage import UsageLedger
+from app.services.pipeline import Pipeline, PipelineStage
+from app.services.plan_sections import ANALYZED_SECTION_NUMBERS, SECTION_NUMBERS, join_plan_sections, section_number_from_name, split_plan_sections
 from app.email import email_service
 
 logger = logging.getLogger(__name__)
 
+class GenerationInput:
+    """Everything the LLM phase needs, copied out of the ORM so no session outlives the read."""
+    def __init__(self, user_id: UUID, project_name: str, user_email: str, user_name: str, data: dict, dirty_sections: list):
+        self.user_id = user_id
+        self.project_name = project_name
+        self.user_email = user_email
+        self.user_name = user_name
+        self.data = data
+        # Sections flagged dirty when the answers were read: the ones a full run brings up to date
+        self.dirty_sections = dirty_sections
+
 class BusinessPlanService:
     def __init__(self):
         self.ai_service = AIGeneratorService()
 
-    def generate_plan_background_task(self, project_id: UUID, user_email: str, user_name: str):
+    async def generate_plan(self, project_id: UUID, mode: GenerationMode = GenerationMode.FULL):
+        """
+        Runs inside the generation worker (`app.worker`). Failures are raised so the job
+        queue can retry the job; the project status is reset once the job runs out of attempts.
+
+        No DB session is held while the model is working: inputs are read in one short
+        session, the LLM stages run with no connection checked out, and results are
+        written in one short transaction. A generation therefore uses a pool connection
+        for milliseconds, and the pool size does not cap concurrent generations.
+        Since there is no request here, the ready email is sent by awaiting the async
+        FastMail sender directly instead of going through BackgroundTasks.
+        """
+        logger.info(f"Starting generation for project {project_id}")
+        generation_input = await asyncio.to_thread(self._load_generation_input, project_id)
+        if not generation_input:
+            logger.error(f"Project not found for task {project_id}")
+            return
+
+        # Every LLM call below, including those of failed attempts, ends up in the usage ledger
+        ledger = UsageLedger(project_id, generation_input.user_id)
+        try:
+            with ledger.recording():
+                regenerated = False
+                if mode == GenerationMode.DIRTY_SECTIONS:
+                    regenerated = await self._regenerate_dirty_sections(project_id, generation_input.data)
+                if not regenerated:
+                    await self._generate_full_plan(project_id, generation_input.data, generation_input.dirty_sections)
+        finally:
+            await asyncio.to_thread(ledger.flush)
+
+        # Trigger email
+        logger.info(f"Sending ready email to {generation_input.user_email}")
+        await self._send_email_async_wrapper(
+            generation_input.user_email, generation_input.user_name, generation_input.project_name, project_id
+        )
+
+    async def _generate_full_plan(self, project_id: UUID, data: dict, dirty_sections: list):
+        # Call AI
+        pipeline = self._build_pipeline(project_id, data)
+        results = await pipeline.run()
+        logger.info(f"Pipeline timings for project {project_id}: {pipeline.timings}")
+
+        # Save to DB
+        logger.info(f"Saving BusinessPlan for project {project_id}")
+        await asyncio.to_thread(
+            self._save_plan, project_id, dirty_sections,
+            results["plan"], results["summary"], results["analysis"], pipeline.timings
+        )
+
+    async def _regenerate_dirty_sections(self, project_id: UUID, data: dict) -> bool:
+        """
+        Rewrites only the sections flagged in `dirty_sections` and re-scores only those,
+        keeping the rest of the plan and its analysis. Returns False when the stored plan
+        cannot be patched (no plan, nothing dirty, or no recognizable section headings),
+        in which case the caller generates the full plan instead.
+        """
+        snapshot = await asyncio.to_thread(self._load_plan_snapshot, project_id)
+        sections = split_plan_sections(snapshot.content_markdown) if snapshot else {}
+        dirty = sorted(set(snapshot.dirty_sections or []) & set(SECTION_NUMBERS)) if snapshot else []
+        if not sections or not dirty:
+            logger.info(f"Plan for project {project_id} cannot be patched, generating the full plan")
+            return False
+
+        logger.info(f"Regenerating sections {dirty} for project {project_id}")
+        pipeline = self._build_dirty_sections_pipeline(project_id, data, snapshot.executive_summary, sections, dirty)
+        results = await pipeline.run()
+        logger.info(f"Pipeline timings for project {project_id}: {pipeline.timings}")
+
+        await asyncio.to_thread(
+            self._save_dirty_sections, project_id, dirty,
+            results["plan"], results["summary"], results["analysis"], pipeline.timings
+        )
+        return True
+
+    def _build_dirty_sections_pipeline(self, project_id: UUID, data: dict, current_summary: str, sections: dict, dirty: list) -> Pipeline:
+        """
+        plan (dirty sections only) ──┬──> summary (only if the executive summary section changed)
+                                     └──> analysis (dirty sections only)
+        """
+        analyzed = [number for number in dirty if number in ANALYZED_SECTION_NUMBERS]
+
+        async def plan_stage():
+            logger.info(f"Calling AI Generator for sections {dirty} of project {project_id}")
+            regenerated = await self.ai_service.generate_plan_sections_async(data, dirty)
+            return join_plan_sections({**sections, **regenerated})
+
+        async def summary_stage(markdown_plan: str):
+            if 1 not in dirty:
+                return current_summary
+            logger.info(f"Calling AI Summary for project {project_id}")
+            return await self.ai_service.generate_executive_summary_async(markdown_plan)
+
+        async def analysis_stage(markdown_plan: str):
+            if not analyzed:
+                return {}
+            logger.info(f"Calling AI Analysis for sections {analyzed} of project {project_id}")
+            return await self.ai_service.generate_advanced_analysis_async(markdown_plan, analyzed)
+
+        return Pipeline([
+            PipelineStage("plan", plan_stage),
+            PipelineStage("summary", summary_stage, depends_on=["plan"]),
+            PipelineStage("analysis", analysis_stage, depends_on=["plan"]),
+        ])
+
+    def _build_pipeline(self, project_id: UUID, data: dict) -> Pipeline:
         """
-        Runs in the background. Creates its own DB Session.
-        Note: We don't use BackgroundTasks here for the email because we are already in the background.
-        We can just call the private async sender or run it in an asyncio loop,
-        but since the email service uses fastmail which is async, let's just 
-        re-use the async email scheduling by creating a new throwaway BackgroundTasks.
+        plan ──┬──> summary
+               └──> analysis
+        Summary and analysis only need the plan markdown, so they run side by side.
         """
+        async def plan_stage():
+            logger.info(f"Calling AI Generator for project {project_id}")
+            if settings.PLAN_GENERATION_MODE == "sections":
+                chunks = self._generate_sections_in_order(data)
+            else:
+                chunks = self.ai_service.stream_business_plan(data)
+            return await self._stream_plan(project_id, chunks)
+
+        async def summary_stage(markdown_plan: str):
+            logger.info(f"Calling AI Summary for project {project_id}")
+            return await self.ai_service.generate_executive_summary_async(markdown_plan)
+
+        async def analysis_stage(markdown_plan: str):
+            logger.info(f"Calling AI Analysis for project {project_id}")
+            return await self.ai_service.generate_advanced_analysis_async(markdown_plan)
+
+        return Pipeline([
+            PipelineStage("plan", plan_stage),
+            PipelineStage("summary", summary_stage, depends_on=["plan"]),
+            PipelineStage("analysis", analysis_stage, depends_on=["plan"]),
+        ])
+
+    async def _stream_plan(self, project_id: UUID, chunks: AsyncIterator[str]) -> str:
+        """
+        Appends the plan markdown to `business_plans.draft_markdown` in batches as it
+        arrives, so readers (GET /projects/{id}/plan/stream) see it while it is written.
+        The saved plan stays in place until `_save_plan` swaps the finished one in, so an
+        attempt that fails midway leaves it untouched.
+        """
+        plan_id = await asyncio.to_thread(self._start_plan_draft, project_id)
+        parts, pending = [], []
+        pending_chars = 0
+        last_flush = time.monotonic()
+
+        async for chunk in chunks:
+            parts.append(chunk)
+            pending.append(chunk)
+            pending_chars += len(chunk)
+            if pending_chars >= settings.PLAN_STREAM_FLUSH_CHARS or time.monotonic() - last_flush >= settings.PLAN_STREAM_FLUSH_SECONDS:
+                await asyncio.to_thread(self._append_plan_draft, plan_id, "".join(pending))
+                pending, pending_chars = [], 0
+                last_flush = time.monotonic()
+
+        if pending:
+            await asyncio.to_thread(self._append_plan_draft, plan_id, "".join(pending))
+        return "".join(parts)
+
+    async def _generate_sections_in_order(self, data: dict) -> AsyncIterator[str]:
+        """
+        PLAN_GENERATION_MODE=sections: one LLM call per top-level section, all in flight
+        at once. Sections are yielded in plan order as soon as every earlier one is done,
+        so wall time follows the slowest section instead of the whole plan.
+        """
+        tasks = [
+            asyncio.create_task(self.ai_service.generate_plan_section_async(data, number))
+            for number in SECTION_NUMBERS
+        ]
+        try:
+            for i, task in enumerate(tasks):
+                text = await task
+                yield text if i == 0 else "\n\n" + text
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _start_plan_draft(self, project_id: UUID) -> UUID:
+        """Creates the plan row if needed and empties its draft before streaming into it."""
+        statement = insert(BusinessPlan).values(project_id=project_id, draft_markdown="")
+        # The saved plan and its ETag (updated_at) do not change until the draft is saved
+        statement = statement.on_conflict_do_update(
+            index_elements=[BusinessPlan.project_id],
+            set_={"draft_markdown": statement.excluded.draft_markdown},
+        ).returning(BusinessPlan.id)
+        db = SessionLocal()
+        try:
+            plan_id = db.execute(statement).scalar_one()
+            db.commit()
+            return plan_id
+        finally:
+            db.close()
+
+    def _append_plan_draft(self, plan_id: UUID, text: str):
         db = SessionLocal()
         try:
-            logger.info(f"Starting background generation for project {project_id}")
-            project = db.query(Project).filter(Project.id == project_id).first()
+            db.query(BusinessPlan).filter(BusinessPlan.id == plan_id).update(
+                {
+                    BusinessPlan.draft_markdown: func.coalesce(BusinessPlan.draft_markdown, "") + text,
+                    # Set explicitly so the onupdate does not bump the saved plan's ETag
+                    BusinessPlan.updated_at: BusinessPlan.updated_at,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _load_plan_snapshot(self, project_id: UUID):
+        db = SessionLocal()
+        try:
+            return db.query(
+                BusinessPlan.content_markdown, BusinessPlan.executive_summary, BusinessPlan.dirty_sections
+            ).filter(BusinessPlan.project_id == project_id).first()
+        finally:
+            db.close()
+
+    def _load_generation_input(self, project_id: UUID):
+        db = SessionLocal()
+        try:
+            project = db.query(Project).options(joinedload(Project.user)).filter(Project.id == project_id).first()
             if not project:
-                logger.error(f"Project not found for task {project_id}")
-                return
+                return None
 
+            # Read before the answers: an edit landing in between stays dirty for the next run
+            dirty_sections = db.query(BusinessPlan.dirty_sections).filter(BusinessPlan.project_id == project_id).scalar()
             answers = db.query(OnboardingAnswer).filter(OnboardingAnswer.project_id == project_id).all()
-            
+
             data = {
                 "name": project.name,
                 "description": project.description,
@@ -41,87 +271,126 @@ class BusinessPlanService:
             if answers:
                 answers_text = "\\n".join([f"Q: {ans.question}\\nR: {ans.answer}\\n" for ans in answers])
                 data["answers"] = answers_text
-            
-            # Call AI
-            logger.info(f"Calling AI Generator for project {project_id}")
-            markdown_plan = self.ai_service.generate_business_plan(data)
-            
-            logger.info(f"Calling AI Summary for project {project_id}")
-            summary = self.ai_service.generate_executive_summary(markdown_plan)
 
-            logger.info(f"Calling AI Analysis for project {project_id}")
-            analysis = self.ai_service.generate_advanced_analysis(markdown_plan)
-            
-            # Save to DB
-            logger.info(f"Saving BusinessPlan for project {project_id}")
-            
-            from app.models.plan import PlanSectionAnalysis
-
-            existing_plan = db.query(BusinessPlan).filter(BusinessPlan.project_id == project_id).first()
-            if existing_plan:
-                existing_plan.content_markdown = markdown_plan
-                existing_plan.executive_summary = summary
-                existing_plan.overall_score = analysis.get("overall_score")
-                
-                # Remote old sections
-                db.query(PlanSectionAnalysis).filter(PlanSectionAnalysis.business_plan_id == existing_plan.id).delete()
-                
-                for sec in analysis.get("sections_analysis", []):
-                    section_analysis = PlanSectionAnalysis(
-                        business_plan_id=existing_plan.id,
-                        section_name=sec.get("section_name", "Unknown section"),
-                        score=sec.get("score"),
-                        suggestions=sec.get("suggestions", [])
-                    )
-                    db.add(section_analysis)
-                    
-            else:
-                plan = BusinessPlan(
-                    project_id=project_id,
-                    content_markdown=markdown_plan,
-                    executive_summary=summary,
-                    overall_score=analysis.get("overall_score")
-                )
-                db.add(plan)
-                db.flush() # ensure plan has an ID generated before adding sections
-                
-                for sec in analysis.get("sections_analysis", []):
-                    section_analysis = PlanSectionAnalysis(
-                        business_plan_id=plan.id,
-                        section_name=sec.get("section_name", "Unknown section"),
-                        score=sec.get("score"),
-                        suggestions=sec.get("suggestions", [])
-                    )
-                    db.add(section_analysis)
-            
-            project.status = ProjectStatus.READY.value
+            return GenerationInput(
+                user_id=project.user_id,
+                project_name=project.name,
+                user_email=project.user.email if project.user else "",
+                user_name=project.user.name if project.user else "",
+                data=data,
+                dirty_sections=dirty_sections or [],
+            )
+        finally:
+            db.close()
+
+    def _save_plan(self, project_id: UUID, regenerated_dirty: list, markdown_plan: str, summary: str, analysis: dict, timings: dict):
+        db = SessionLocal()
+        try:
+            # Row lock as in _save_dirty_sections; sections marked dirty during the run stay dirty
+            current = db.query(BusinessPlan.dirty_sections).filter(BusinessPlan.project_id == project_id).with_for_update().scalar()
+            remaining = sorted(set(current or []) - set(regenerated_dirty)) or None
+            self._write_plan(db, project_id, markdown_plan, summary, analysis, timings, remaining)
+            self._mark_project_ready(db, project_id)
             db.commit()
+        finally:
+            db.close()
 
-            # Trigger email
-            logger.info(f"Scheduling email for {user_email}")
-            # To call async FastMail code from a sync thread, use asyncio
-            import asyncio
-            
-            # Use a throwaway loop or wait for the existing one
-            try:
-                loop = asyncio.get_running_loop()
-                # We shouldn't be here since BackgroundTask runs in threadpool
-                loop.create_task(self._send_email_async_wrapper(user_email, user_name, project.name, project_id))
-            except RuntimeError:
-                asyncio.run(self._send_email_async_wrapper(user_email, user_name, project.name, project_id))
+    def _write_plan(self, db: Session, project_id: UUID, markdown_plan: str, summary: str, analysis: dict, timings: dict,
+                    dirty_sections: Optional[list] = None):
+        """
+        Replaces the plan of a project in three statements and no ORM flush: the plan row is
+        upserted on its unique project_id (dropping the streamed draft it replaces), then its
+        section analyses are deleted and re-inserted with one multi-row INSERT.
+        `dirty_sections` is what is left to regenerate. The caller commits.
+        """
+        statement = insert(BusinessPlan).values(
+            project_id=project_id,
+            content_markdown=markdown_plan,
+            content_markdown_gzip=self._compress_markdown(markdown_plan),
+            executive_summary=summary,
+            overall_score=analysis.get("overall_score"),
+            stage_timings=timings,
+            dirty_sections=dirty_sections,
+            draft_markdown=None,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[BusinessPlan.project_id],
+            set_={
+                column: statement.excluded[column]
+                for column in (
+                    "content_markdown", "content_markdown_gzip", "draft_markdown", "executive_summary",
+                    "overall_score", "stage_timings", "dirty_sections",
+                )
+            } | {"updated_at": func.now()},
+        ).returning(BusinessPlan.id)
+        plan_id = db.execute(statement).scalar_one()
 
-        except Exception as e:
-            logger.error(f"Failed to generate plan for {project_id}: {str(e)}")
-            try:
-                project = db.query(Project).filter(Project.id == project_id).first()
-                if project:
-                    project.status = ProjectStatus.ONBOARDING.value 
-                    db.commit()
-            except:
-                pass
+        db.execute(delete(PlanSectionAnalysis).where(PlanSectionAnalysis.business_plan_id == plan_id))
+        sections = [
+            {
+                "business_plan_id": plan_id,
+                "section_name": sec.get("section_name", "Unknown section"),
+                "score": sec.get("score"),
+                "suggestions": sec.get("suggestions", []),
+            }
+            for sec in analysis.get("sections_analysis", [])
+        ]
+        if sections:
+            db.execute(insert(PlanSectionAnalysis).values(sections))
+
+    def _save_dirty_sections(self, project_id: UUID, dirty: list, markdown_plan: str, summary: str, analysis: dict, timings: dict):
+        db = SessionLocal()
+        try:
+            # Row lock: onboarding edits marking more sections dirty wait for this short write
+            plan = db.query(BusinessPlan).filter(BusinessPlan.project_id == project_id).with_for_update().first()
+            if not plan:
+                self._write_plan(db, project_id, markdown_plan, summary, analysis, timings)
+            else:
+                self._patch_plan_sections(plan, dirty, markdown_plan, summary, analysis, timings)
+            self._mark_project_ready(db, project_id)
+            db.commit()
         finally:
             db.close()
 
+    def _patch_plan_sections(self, plan: BusinessPlan, dirty: list, markdown_plan: str, summary: str, analysis: dict, timings: dict):
+        plan.content_markdown = markdown_plan
+        plan.content_markdown_gzip = self._compress_markdown(markdown_plan)
+        plan.executive_summary = summary
+        plan.stage_timings = timings
+        # Answers edited while we were generating stay dirty for the next run
+        plan.dirty_sections = sorted(set(plan.dirty_sections or []) - set(dirty)) or None
+
+        new_sections = [
+            sec for sec in analysis.get("sections_analysis", [])
+            if section_number_from_name(sec.get("section_name")) in dirty
+        ]
+        if new_sections:
+            rescored = {section_number_from_name(sec.get("section_name")) for sec in new_sections}
+            for old in list(plan.sections):
+                if section_number_from_name(old.section_name) in rescored:
+                    plan.sections.remove(old)
+            for sec in new_sections:
+                plan.sections.append(PlanSectionAnalysis(
+                    section_name=sec.get("section_name", "Unknown section"),
+                    score=sec.get("score"),
+                    suggestions=sec.get("suggestions", [])
+                ))
+            # The model only scored part of the plan, so the overall score is the section average
+            scores = [sec.score for sec in plan.sections if sec.score is not None]
+            if scores:
+                plan.overall_score = round(sum(scores) / len(scores))
+
+    def _compress_markdown(self, markdown_plan: str) -> Optional[bytes]:
+        """Pre-compressed copy stored next to the markdown, so reads never recompress it."""
+        if not settings.PLAN_STORE_COMPRESSED or not markdown_plan:
+            return None
+        return gzip_bytes(markdown_plan.encode("utf-8"))
+
+    def _mark_project_ready(self, db: Session, project_id: UUID):
+        db.query(Project).filter(Project.id == project_id).update(
+            {Project.status: ProjectStatus.READY.value}, synchronize_session=False
+        )
+
     async def _send_email_async_wrapper(self, user_email: str, user_name: str, project_name: str, project_id: UUID):
         try:
             from fastapi_mail import MessageSchema, MessageType
@@ -1,7 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import ConsultingRequest, Project, User
-from app.schemas.consulting import ConsultingRequestCreate
+from app.schemas.consulting import ConsultingRequestCreate, ConsultingRequestResponse
 from app.dependencies import EntityNotFoundException
+from app.services.pagination import DEFAULT_PAGE_SIZE, KeysetPage
 from uuid import UUID
 import random
 import string
@@ -15,10 +18,7 @@ class ConsultingService:
         if not project:
              raise EntityNotFoundException("Project")
              
-        # Generate Fake Meet Link
-        # Format: xxx-xxx-xxx
-        meeting_code = '-'.join([''.join(random.choices(string.ascii_lowercase, k=3)) for _ in range(3)])
-        meeting_link = f"https://meet.google.com/{meeting_code}"
+        meeting_link = self._new_meeting_link()
              
         db_request = ConsultingRequest(
             user_id=user_id,
@@ -38,8 +38,9 @@ class ConsultingService:
         return db_request
 
 
-    def get_requests(self, db: Session, user_id: UUID):
-        return db.query(ConsultingRequest).filter(ConsultingRequest.user_id == user_id).all()
+    def get_requests(self, db: Session, user_id: UUID, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, fields: str = None):
+        page = KeysetPage(ConsultingRequest, ConsultingRequestResponse.model_fields, fields, cursor, limit)
+        return page.build(db.execute(page.query(ConsultingRequest.user_id == user_id)))
 
     def delete_request(self, db: Session, request_id: UUID, user_id: UUID):
         request = db.query(ConsultingRequest).filter(ConsultingRequest.id == request_id, ConsultingRequest.user_id == user_id).first()
@@ -47,3 +48,47 @@ class ConsultingService:
             raise EntityNotFoundException("Consulting Request")
         db.delete(request)
         db.commit()
+
+    def _new_meeting_link(self) -> str:
+        # Generate Fake Meet Link
+        # Format: xxx-xxx-xxx
+        meeting_code = '-'.join([''.join(random.choices(string.ascii_lowercase, k=3)) for _ in range(3)])
+        return f"https://meet.google.com/{meeting_code}"
+
+class AsyncConsultingService(ConsultingService):
+    """ConsultingService on an AsyncSession (ASYNC_DB=true)."""
+
+    async def create_request(self, db: AsyncSession, request: ConsultingRequestCreate, user_id: UUID, background_tasks: BackgroundTasks):
+        # Verify project ownership/existence
+        project_id = await db.scalar(select(Project.id).where(Project.id == request.project_id, Project.user_id == user_id))
+        if not project_id:
+            raise EntityNotFoundException("Project")
+
+        meeting_link = self._new_meeting_link()
+        db_request = ConsultingRequest(
+            user_id=user_id,
+            project_id=request.project_id,
+            type=request.type,
+            objective=request.objective,
+            meeting_link=meeting_link
+        )
+        db.add(db_request)
+        await db.commit()
+        await db.refresh(db_request)
+
+        # Simulate sending email
+        user = await db.get(User, user_id)
+        email_service.send_consulting_scheduled_email(background_tasks, user.email, meeting_link, request.objective)
+
+        return db_request
+
+    async def get_requests(self, db: AsyncSession, user_id: UUID, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, fields: str = None):
+        page = KeysetPage(ConsultingRequest, ConsultingRequestResponse.model_fields, fields, cursor, limit)
+        return page.build(await db.execute(page.query(ConsultingRequest.user_id == user_id)))
+
+    async def delete_request(self, db: AsyncSession, request_id: UUID, user_id: UUID):
+        request = await db.scalar(select(ConsultingRequest).where(ConsultingRequest.id == request_id, ConsultingRequest.user_id == user_id))
+        if not request:
+            raise EntityNotFoundException("Consulting Request")
+        await db.delete(request)
+        await db.commit()
@@ -0,0 +1,268 @@
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+from sqlalchemy import Float, String, and_, cast, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.config import settings
+from app.metrics import GENERATION_FAILURES
+from app.models import BusinessPlan, GenerationJob, GenerationMode, JobStatus, Project, ProjectStatus
+
+logger = logging.getLogger(__name__)
+
+class JobService:
+    """
+    Database-backed queue for plan generation jobs.
+
+    Jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of
+    workers (threads, processes or nodes) can poll the same table without
+    handing the same job out twice. A claimed job holds a lease (`locked_until`);
+    if the worker dies the lease expires and the job becomes claimable again.
+
+    Jobs are not handed out FIFO: see `claim` for the per-user fair share.
+    """
+
+    def enqueue(self, db: Session, project_id: UUID, user_id: UUID, mode: GenerationMode = GenerationMode.FULL,
+                access_level: Optional[str] = None, input_hash: Optional[str] = None,
+                idempotency_key: Optional[str] = None, before_commit: Optional[Callable[[], None]] = None) -> GenerationJob:
+        """
+        Raises IntegrityError if the project already has a queued or running job, or the user
+        already used `idempotency_key` (see OnboardingService.complete_onboarding).
+        `before_commit` runs once the job is inserted and has passed those unique indexes;
+        if it raises, the job is rolled back.
+        """
+        job = self._new_job(project_id, user_id, mode, access_level, input_hash, idempotency_key)
+        db.add(job)
+        db.flush()
+        if before_commit:
+            try:
+                before_commit()
+            except Exception:
+                db.rollback()
+                raise
+        db.commit()
+        db.refresh(job)
+        return job
+
+    async def enqueue_async(self, db: AsyncSession, project_id: UUID, user_id: UUID, mode: GenerationMode = GenerationMode.FULL,
+                            access_level: Optional[str] = None, input_hash: Optional[str] = None,
+                            idempotency_key: Optional[str] = None,
+                            before_commit: Optional[Callable[[], Awaitable[None]]] = None) -> GenerationJob:
+        job = self._new_job(project_id, user_id, mode, access_level, input_hash, idempotency_key)
+        db.add(job)
+        await db.flush()
+        if before_commit:
+            try:
+                await before_commit()
+            except Exception:
+                await db.rollback()
+                raise
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    def get_active(self, db: Session, project_id: UUID) -> Optional[GenerationJob]:
+        """The project's queued or running job, if any (there is at most one)."""
+        return db.scalar(self._active_query(project_id))
+
+    async def get_active_async(self, db: AsyncSession, project_id: UUID) -> Optional[GenerationJob]:
+        return await db.scalar(self._active_query(project_id))
+
+    def get_by_idempotency_key(self, db: Session, user_id: UUID, idempotency_key: str) -> Optional[GenerationJob]:
+        return db.scalar(self._idempotency_key_query(user_id, idempotency_key))
+
+    async def get_by_idempotency_key_async(self, db: AsyncSession, user_id: UUID, idempotency_key: str) -> Optional[GenerationJob]:
+        return await db.scalar(self._idempotency_key_query(user_id, idempotency_key))
+
+    def _active_query(self, project_id: UUID):
+        return select(GenerationJob).where(
+            GenerationJob.project_id == project_id,
+            GenerationJob.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value]),
+        )
+
+    def _idempotency_key_query(self, user_id: UUID, idempotency_key: str):
+        return select(GenerationJob).where(
+            GenerationJob.user_id == user_id,
+            GenerationJob.idempotency_key == idempotency_key,
+        )
+
+    def _new_job(self, project_id: UUID, user_id: UUID, mode: GenerationMode, access_level: Optional[str],
+                 input_hash: Optional[str], idempotency_key: Optional[str]) -> GenerationJob:
+        return GenerationJob(
+            project_id=project_id,
+            user_id=user_id,
+            status=JobStatus.QUEUED.value,
+            mode=mode.value,
+            priority=settings.JOB_PRIORITY_WEIGHTS.get(access_level, 1),
+            input_hash=input_hash,
+            idempotency_key=idempotency_key,
+            attempts=0,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+
+    def claim(self, db: Session, worker_id: str) -> Optional[GenerationJob]:
+        """
+        Claims a runnable job (queued and due, or with an expired lease), scheduling users
+        rather than jobs: each user's oldest runnable job competes, and the user with the
+        fewest running jobs per unit of weight (`priority`) wins, oldest job first on ties.
+        A user's batch therefore cannot starve others, a paid user waiting for a first slot
+        goes ahead of free users, and users at JOB_MAX_RUNNING_PER_USER are skipped.
+        """
+        now = func.now()
+        runnable = or_(
+            and_(GenerationJob.status == JobStatus.QUEUED.value, GenerationJob.run_after <= now),
+            and_(GenerationJob.status == JobStatus.RUNNING.value, GenerationJob.locked_until < now),
+        )
+        heads = (
+            select(GenerationJob.id)
+            .where(runnable)
+            .distinct(GenerationJob.user_id)
+            .order_by(GenerationJob.user_id, GenerationJob.run_after)
+            .subquery()
+        )
+        running = self._running_per_user().subquery()
+        user_running = func.coalesce(running.c.running, 0)
+        query = (
+            db.query(GenerationJob)
+            .join(heads, heads.c.id == GenerationJob.id)
+            .outerjoin(running, running.c.user_id == GenerationJob.user_id)
+        )
+        if settings.JOB_MAX_RUNNING_PER_USER:
+            query = query.filter(user_running < settings.JOB_MAX_RUNNING_PER_USER)
+        job = (
+            query
+            .order_by(
+                cast(user_running + 1, Float) / GenerationJob.priority,
+                GenerationJob.priority.desc(),
+                GenerationJob.run_after,
+            )
+            .with_for_update(of=GenerationJob, skip_locked=True)
+            .first()
+        )
+        if not job:
+            db.rollback()
+            return None
+
+        if settings.JOB_MAX_RUNNING_PER_USER and not self._below_user_cap(db, job.user_id):
+            # Another worker started a job of this user after our snapshot was taken
+            db.rollback()
+            return None
+
+        if job.status == JobStatus.RUNNING.value:
+            logger.warning(f"Lease expired for job {job.id} (held by {job.locked_by}), reclaiming")
+            GENERATION_FAILURES.labels("lease_expired").inc()
+            if job.attempts >= job.max_attempts:
+                self._finish_failed(db, job, "Lease expired after the last attempt")
+                db.commit()
+                return None
+
+        job.status = JobStatus.RUNNING.value
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_until = now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def _running_per_user(self):
+        """Jobs holding a live lease, per user. Expired leases are not counted: their worker is gone."""
+        return (
+            select(GenerationJob.user_id, func.count().label("running"))
+            .where(GenerationJob.status == JobStatus.RUNNING.value, GenerationJob.locked_until >= func.now())
+            .group_by(GenerationJob.user_id)
+        )
+
+    def _below_user_cap(self, db: Session, user_id: UUID) -> bool:
+        """
+        Re-counts the user's running jobs under a per-user advisory lock held until commit,
+        so concurrent claims for the same user are serialized and see each other's jobs.
+        """
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(cast(user_id, String), 0))))
+        running = db.scalar(
+            select(func.count()).select_from(GenerationJob).where(
+                GenerationJob.user_id == user_id,
+                GenerationJob.status == JobStatus.RUNNING.value,
+                GenerationJob.locked_until >= func.now(),
+            )
+        )
+        return running < settings.JOB_MAX_RUNNING_PER_USER
+
+    def queue_depth(self, db: Session) -> dict:
+        """Number of queued and running jobs, for the generation_jobs metric."""
+        depth = {JobStatus.QUEUED.value: 0, JobStatus.RUNNING.value: 0}
+        rows = db.query(GenerationJob.status, func.count()).filter(
+            GenerationJob.status.in_(list(depth))
+        ).group_by(GenerationJob.status).all()
+        depth.update(dict(rows))
+        return depth
+
+    def heartbeat(self, db: Session, job_id: UUID, worker_id: str) -> bool:
+        """Extends the lease of a running job. Returns False if the lease was lost."""
+        updated = db.query(GenerationJob).filter(
+            GenerationJob.id == job_id,
+            GenerationJob.status == JobStatus.RUNNING.value,
+            GenerationJob.locked_by == worker_id,
+        ).update(
+            {GenerationJob.locked_until: func.now() + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)},
+            synchronize_session=False,
+        )
+        db.commit()
+        return updated > 0
+
+    def mark_succeeded(self, db: Session, job_id: UUID, worker_id: str):
+        job = self._get_owned(db, job_id, worker_id)
+        if not job:
+            return
+        job.status = JobStatus.SUCCEEDED.value
+        job.locked_by = None
+        job.locked_until = None
+        job.finished_at = func.now()
+        db.commit()
+
+    def mark_failed(self, db: Session, job_id: UUID, worker_id: str, error: str):
+        """Schedules a retry with exponential backoff, or fails the job for good."""
+        job = self._get_owned(db, job_id, worker_id)
+        if not job:
+            return
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1))
+            logger.warning(f"Job {job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying in {delay}s: {error}")
+            job.status = JobStatus.QUEUED.value
+            job.last_error = error
+            job.locked_by = None
+            job.locked_until = None
+            job.run_after = func.now() + timedelta(seconds=delay)
+        else:
+            self._finish_failed(db, job, error)
+        db.commit()
+
+    def _finish_failed(self, db: Session, job: GenerationJob, error: str):
+        logger.error(f"Job {job.id} failed permanently after {job.attempts} attempts: {error}")
+        job.status = JobStatus.FAILED.value
+        job.last_error = error
+        job.locked_by = None
+        job.locked_until = None
+        job.finished_at = func.now()
+
+        # Drop the partial draft. Generations only replace the saved plan once they succeed,
+        # so a project that had one gets it back as READY; otherwise it returns to onboarding.
+        has_plan = db.execute(
+            update(BusinessPlan)
+            .where(BusinessPlan.project_id == job.project_id)
+            .values(draft_markdown=None, updated_at=BusinessPlan.updated_at)
+            .returning(BusinessPlan.content_markdown != "")
+        ).scalar()
+        project = db.query(Project).filter(Project.id == job.project_id).first()
+        if project and project.status == ProjectStatus.GENERATING.value:
+            project.status = ProjectStatus.READY.value if has_plan else ProjectStatus.ONBOARDING.value
+
+    def _get_owned(self, db: Session, job_id: UUID, worker_id: str) -> Optional[GenerationJob]:
+        job = db.query(GenerationJob).filter(
+            GenerationJob.id == job_id,
+            GenerationJob.locked_by == worker_id,
+        ).with_for_update().first()
+        if not job:
+            logger.warning(f"Job {job_id} is no longer leased by {worker_id}, ignoring result")
+        return job
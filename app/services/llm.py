@@ -0,0 +1,103 @@
+import asyncio
+import json
+import re
+from typing import AsyncIterator, Optional
+from google import genai
+from app.config import settings
+
+class LLMResponse:
+    """Text returned by a backend plus the usage numbers we get back with it."""
+    def __init__(self, text: str, prompt_tokens: Optional[int] = None, output_tokens: Optional[int] = None, cached: bool = False):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.cached = cached
+
+class LLMNotConfiguredError(RuntimeError):
+    """Raised by generation stages when there is no backend (Gemini without an API key)."""
+
+class GeminiBackend:
+    def __init__(self, api_key: str):
+        self.client = genai.Client(api_key=api_key)
+
+    async def agenerate(self, model: str, prompt: str) -> LLMResponse:
+        response = await self.client.aio.models.generate_content(model=model, contents=prompt)
+        return self._to_response(response)
+
+    async def astream(self, model: str, prompt: str) -> AsyncIterator[LLMResponse]:
+        """Yields the response in chunks as Gemini produces them."""
+        async for chunk in await self.client.aio.models.generate_content_stream(model=model, contents=prompt):
+            response = self._to_response(chunk)
+            if response.text or response.output_tokens is not None:
+                response.text = response.text or ""
+                yield response
+
+    def _to_response(self, response) -> LLMResponse:
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=response.text,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None),
+        )
+
+class FakeLLMBackend:
+    """
+    Offline stand-in for Gemini (LLM_BACKEND=fake), for local development and load tests.
+    Answers instantly (or after FAKE_LLM_LATENCY_SECONDS) with text shaped like the
+    real responses: a markdown plan following the requested headings, a short summary,
+    or the JSON expected by the advanced analysis.
+    """
+    HEADING_RE = re.compile(r"^(#{1,2} \d+(?:\.\d+)?\.? .+?)\s*$", re.MULTILINE)
+    STREAM_CHUNK_CHARS = 200
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def agenerate(self, model: str, prompt: str) -> LLMResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def astream(self, model: str, prompt: str) -> AsyncIterator[LLMResponse]:
+        response = self._respond(prompt)
+        chunks = [response.text[i:i + self.STREAM_CHUNK_CHARS] for i in range(0, len(response.text), self.STREAM_CHUNK_CHARS)]
+        for i, chunk in enumerate(chunks):
+            if self.latency:
+                await asyncio.sleep(self.latency / len(chunks))
+            last = i == len(chunks) - 1
+            yield LLMResponse(
+                text=chunk,
+                prompt_tokens=response.prompt_tokens if last else None,
+                output_tokens=response.output_tokens if last else None,
+            )
+
+    def _respond(self, prompt: str) -> LLMResponse:
+        if '"sections_analysis"' in prompt:
+            text = self._analysis(prompt)
+        elif "PLANO DE NEGÓCIOS:" in prompt:
+            text = "Resumo executivo gerado pelo backend de testes."
+        else:
+            text = self._plan(prompt)
+        return LLMResponse(text=text, prompt_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+
+    def _plan(self, prompt: str) -> str:
+        headings = self.HEADING_RE.findall(prompt)
+        return "\n\n".join(f"{heading}\nConteúdo gerado pelo backend de testes." for heading in headings)
+
+    def _analysis(self, prompt: str) -> str:
+        section_names = re.findall(r"^(\d+\. [^\n]+)$", prompt.split("Responda ESTRITAMENTE")[0], re.MULTILINE)
+        return json.dumps({
+            "overall_score": 70,
+            "sections_analysis": [
+                {"section_name": name, "score": 70, "suggestions": ["Sugestão gerada pelo backend de testes."]}
+                for name in section_names
+            ],
+        })
+
+def get_llm_backend():
+    """Returns the configured backend, or None when Gemini has no API key."""
+    if settings.LLM_BACKEND == "fake":
+        return FakeLLMBackend(latency=settings.FAKE_LLM_LATENCY_SECONDS)
+    if settings.GEMINI_API_KEY:
+        return GeminiBackend(settings.GEMINI_API_KEY)
+    return None
@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import threading
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+from app.cache import MemoryCache
+from app.config import settings
+from app.database import SessionLocal
+from app.models.llm_cache import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+class DatabaseCacheBackend:
+    """Cache backend on the `llm_cache_entries` table, shared by every API and worker process."""
+
+    def __init__(self, default_ttl: Optional[float] = None):
+        self.default_ttl = default_ttl
+
+    def get(self, key: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry.response).filter(
+                LLMCacheEntry.key == key,
+                or_(LLMCacheEntry.expires_at.is_(None), LLMCacheEntry.expires_at > func.now()),
+            ).first()
+            return entry.response if entry else None
+        finally:
+            db.close()
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = func.now() + timedelta(seconds=ttl) if ttl else None
+        stmt = insert(LLMCacheEntry).values(key=key, response=value, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LLMCacheEntry.key],
+            set_={"response": stmt.excluded.response, "expires_at": stmt.excluded.expires_at, "created_at": func.now()},
+        )
+        db = SessionLocal()
+        try:
+            db.execute(stmt)
+            db.commit()
+        finally:
+            db.close()
+
+    def delete(self, key: str):
+        db = SessionLocal()
+        try:
+            db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        db = SessionLocal()
+        try:
+            deleted = db.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at <= func.now()).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+class LLMCache:
+    """
+    Content-addressed cache of LLM responses.
+
+    The key is a hash of the model name and the fully rendered prompt, so an
+    identical request (e.g. regenerating a plan with unchanged onboarding answers)
+    is answered from the cache without calling the model.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        try:
+            value = self.backend.get(self.make_key(model, prompt))
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, model: str, prompt: str, text: str):
+        try:
+            self.backend.set(self.make_key(model, prompt), text)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def delete(self, model: str, prompt: str):
+        try:
+            self.backend.delete(self.make_key(model, prompt))
+        except Exception as e:
+            logger.warning(f"LLM cache delete failed: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hits / total, 3) if total else 0.0}
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Returns the configured cache, or None when LLM_CACHE_BACKEND is "none"."""
+    ttl = settings.LLM_CACHE_TTL_SECONDS or None
+    if settings.LLM_CACHE_BACKEND == "database":
+        return LLMCache(DatabaseCacheBackend(default_ttl=ttl))
+    if settings.LLM_CACHE_BACKEND == "memory":
+        return LLMCache(MemoryCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES, default_ttl=ttl))
+    return None
+
+llm_cache = get_llm_cache()
@@ -0,0 +1,52 @@
+import asyncio
+import time
+from app.config import settings
+
+class LLMRateLimiter:
+    """
+    Process-wide limit on LLM traffic for the async generation path.
+
+    Caps both the number of calls in flight (semaphore) and the request rate
+    (token bucket refilled at `requests_per_minute`), so concurrent generations
+    queue here instead of piling up on Gemini or on the threadpool.
+    Must be used from a single event loop, which is the case for both the API
+    and the worker process.
+    """
+    def __init__(self, max_in_flight: int, requests_per_minute: int):
+        self.max_in_flight = max_in_flight
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._bucket_lock = asyncio.Lock()
+        self._tokens = float(requests_per_minute)
+        self._last_refill = time.monotonic()
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+
+    async def _take_token(self):
+        if self.requests_per_minute <= 0:
+            return
+        rate = self.requests_per_minute / 60.0
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(float(self.requests_per_minute), self._tokens + (now - self._last_refill) * rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / rate)
+
+llm_limiter = LLMRateLimiter(
+    max_in_flight=settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+)
@@ -0,0 +1,122 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import Date, cast, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import LLMUsage
+from app.services.llm import LLMResponse
+
+logger = logging.getLogger(__name__)
+
+# Ledger of the generation running in the current task; pipeline stages inherit it
+_current_ledger: ContextVar[Optional["UsageLedger"]] = ContextVar("llm_usage_ledger", default=None)
+
+class UsageLedger:
+    """
+    Token usage of one plan generation. LLM calls made while `recording()` is active are
+    collected here and written to `llm_usage` with a single INSERT by `flush()`.
+    """
+    def __init__(self, project_id: UUID, user_id: UUID):
+        self.project_id = project_id
+        self.user_id = user_id
+        self.entries = []
+
+    @contextmanager
+    def recording(self):
+        token = _current_ledger.set(self)
+        try:
+            yield self
+        finally:
+            _current_ledger.reset(token)
+
+    def add(self, stage: str, model: str, response: LLMResponse, latency: float):
+        self.entries.append({
+            "project_id": self.project_id,
+            "user_id": self.user_id,
+            "stage": stage,
+            "model": model,
+            "prompt_tokens": response.prompt_tokens,
+            "output_tokens": response.output_tokens,
+            "latency_ms": round(latency * 1000),
+            "cached": response.cached,
+        })
+
+    def flush(self):
+        """Writes the collected entries. Losing usage rows must not fail a generation, so errors are only logged."""
+        if not self.entries:
+            return
+        entries, self.entries = self.entries, []
+        db = SessionLocal()
+        try:
+            db.execute(insert(LLMUsage).values(entries))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to record LLM usage for project {self.project_id}: {e}")
+        finally:
+            db.close()
+
+def record_llm_usage(stage: str, model: str, response: LLMResponse, latency: float):
+    """Adds a call to the ledger of the running generation, if there is one."""
+    ledger = _current_ledger.get()
+    if ledger is not None:
+        ledger.add(stage, model, response, latency)
+
+class LLMUsageService:
+    """Aggregates over the `llm_usage` ledger, for the admin endpoints."""
+    DEFAULT_DAYS = 30
+
+    def daily_usage(self, db: Session, since: Optional[date] = None, until: Optional[date] = None, user_id: Optional[UUID] = None):
+        return self._rows(db.execute(self._daily_query(since, until, user_id)))
+
+    def stage_usage(self, db: Session, since: Optional[date] = None, until: Optional[date] = None,
+                    user_id: Optional[UUID] = None, project_id: Optional[UUID] = None):
+        return self._rows(db.execute(self._stage_query(since, until, user_id, project_id)))
+
+    def _daily_query(self, since: Optional[date], until: Optional[date], user_id: Optional[UUID]):
+        day = cast(func.timezone("UTC", LLMUsage.created_at), Date).label("day")
+        query = select(LLMUsage.user_id, day, *self._totals()).where(*self._period(since, until))
+        if user_id:
+            query = query.where(LLMUsage.user_id == user_id)
+        return query.group_by(LLMUsage.user_id, day).order_by(day.desc(), LLMUsage.user_id)
+
+    def _stage_query(self, since: Optional[date], until: Optional[date], user_id: Optional[UUID], project_id: Optional[UUID]):
+        query = select(LLMUsage.stage, LLMUsage.model, *self._totals()).where(*self._period(since, until))
+        if user_id:
+            query = query.where(LLMUsage.user_id == user_id)
+        if project_id:
+            query = query.where(LLMUsage.project_id == project_id)
+        return query.group_by(LLMUsage.stage, LLMUsage.model).order_by(LLMUsage.stage, LLMUsage.model)
+
+    def _totals(self):
+        return (
+            func.count().label("calls"),
+            func.count().filter(LLMUsage.cached).label("cached_calls"),
+            func.coalesce(func.sum(LLMUsage.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(LLMUsage.output_tokens), 0).label("output_tokens"),
+            func.coalesce(func.avg(LLMUsage.latency_ms).filter(~LLMUsage.cached), 0).label("avg_latency_ms"),
+        )
+
+    def _period(self, since: Optional[date], until: Optional[date]):
+        """`since` and `until` are inclusive UTC days; the default is the last DEFAULT_DAYS days."""
+        until = until or datetime.now(timezone.utc).date()
+        since = since or until - timedelta(days=self.DEFAULT_DAYS - 1)
+        return (
+            LLMUsage.created_at >= datetime.combine(since, time.min, tzinfo=timezone.utc),
+            LLMUsage.created_at < datetime.combine(until + timedelta(days=1), time.min, tzinfo=timezone.utc),
+        )
+
+    def _rows(self, result):
+        return [row._asdict() for row in result]
+
+class AsyncLLMUsageService(LLMUsageService):
+    async def daily_usage(self, db: AsyncSession, since: Optional[date] = None, until: Optional[date] = None, user_id: Optional[UUID] = None):
+        return self._rows(await db.execute(self._daily_query(since, until, user_id)))
+
+    async def stage_usage(self, db: AsyncSession, since: Optional[date] = None, until: Optional[date] = None,
+                          user_id: Optional[UUID] = None, project_id: Optional[UUID] = None):
+        return self._rows(await db.execute(self._stage_query(since, until, user_id, project_id)))
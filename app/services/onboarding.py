@@ -1,20 +1,93 @@
+import hashlib
+import json
+from sqlalchemy import literal_column, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models import OnboardingAnswer, BusinessPlan, Project, ProjectStatus
+from fastapi import HTTPException, status
+from app.models import OnboardingAnswer, BusinessPlan, GenerationJob, GenerationMode, Project, ProjectStatus
 from app.schemas.onboarding import OnboardingAnswerCreate
 from app.dependencies import EntityNotFoundException
+from typing import Awaitable, Callable, Optional
 from uuid import UUID
-from fastapi import BackgroundTasks
-from app.services.business_plans import BusinessPlanService
+from app.services.jobs import JobService
+from app.services.projects import ONBOARDING_QUESTIONS, sections_for_questions
+
+def upsert_answers_statement(project_id: UUID, answers: list[OnboardingAnswerCreate]):
+    """
+    INSERT ... ON CONFLICT (project_id, question) DO UPDATE for a batch of answers,
+    RETURNING each saved row with its `previous_answer` (NULL if it was inserted), read
+    from a CTE: every part of the statement sees the table as it was before the write.
+    Returns None for an empty batch.
+    """
+    unknown = sorted({ans.question for ans in answers} - set(ONBOARDING_QUESTIONS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown onboarding questions: {', '.join(unknown)}"
+        )
+    # A row cannot be updated twice by one ON CONFLICT statement, so the last value sent wins
+    latest = {ans.question: ans.answer for ans in answers}
+    if not latest:
+        return None
+
+    previous = select(OnboardingAnswer.question, OnboardingAnswer.answer).where(
+        OnboardingAnswer.project_id == project_id,
+        OnboardingAnswer.question.in_(latest),
+    ).cte("previous")
+    previous_answer = select(previous.c.answer).where(
+        previous.c.question == literal_column("onboarding_answers.question")
+    ).scalar_subquery()
+
+    statement = insert(OnboardingAnswer).values([
+        {"project_id": project_id, "question": question, "answer": answer}
+        for question, answer in latest.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[OnboardingAnswer.project_id, OnboardingAnswer.question],
+        set_={"answer": statement.excluded.answer},
+    )
+    return statement.add_cte(previous).returning(
+        OnboardingAnswer.id,
+        OnboardingAnswer.project_id,
+        OnboardingAnswer.question,
+        OnboardingAnswer.answer,
+        previous_answer.label("previous_answer"),
+    )
+
+def generation_input_hash(mode: GenerationMode, answers) -> str:
+    """Fingerprint of what a generation would be run with: the mode and the (question, answer) rows."""
+    payload = json.dumps([mode.value, sorted([question, answer] for question, answer in answers)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def answers_query(project_id: UUID):
+    return select(OnboardingAnswer.question, OnboardingAnswer.answer).where(OnboardingAnswer.project_id == project_id)
+
+def reuse_idempotent_job(job: GenerationJob, project_id: UUID) -> GenerationJob:
+    """The job a repeated Idempotency-Key created, whatever its status, provided it is for the same project."""
+    if job.project_id != project_id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="This Idempotency-Key was already used for another project."
+        )
+    return job
+
+def reuse_active_job(job: GenerationJob, input_hash: str) -> GenerationJob:
+    """The in-flight job of the project, if it was started with the same inputs."""
+    if job.input_hash != input_hash:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A plan generation with different answers is already in progress for this project."
+        )
+    return job
 
 class OnboardingService:
     def __init__(self):
-        self.business_plan_service = BusinessPlanService()
+        self.job_service = JobService()
 
-    def get_answers(self, db: Session, project_id: UUID):
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            raise EntityNotFoundException("Project")
-        return db.query(OnboardingAnswer).filter(OnboardingAnswer.project_id == project_id).all()
+    def get_answers(self, db: Session, project: Project):
+        return db.query(OnboardingAnswer).filter(OnboardingAnswer.project_id == project.id).all()
 
     def update_single_answer(self, db: Session, project_id: UUID, question_label: str, new_answer: str):
         answer = db.query(OnboardingAnswer).filter(
@@ -23,66 +96,166 @@ class OnboardingService:
         ).first()
         if not answer:
             raise EntityNotFoundException("Onboarding Answer")
-        answer.answer = new_answer
+        if answer.answer != new_answer:
+            answer.answer = new_answer
+            self._mark_plan_sections_dirty(db, project_id, [question_label])
         db.commit()
         db.refresh(answer)
         return answer
 
-    def save_answers(self, db: Session, project_id: UUID, answers: list[OnboardingAnswerCreate]):
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            raise EntityNotFoundException("Project")
-            
-        created_answers = []
-        for ans in answers:
-            db_answer = OnboardingAnswer(
-                project_id=project_id,
-                question=ans.question,
-                answer=ans.answer
-            )
-            db.add(db_answer)
-            created_answers.append(db_answer)
-        
-        db.commit()
-        return created_answers
-
-    def update_answers(self, db: Session, project_id: UUID, answers: list[OnboardingAnswerCreate]):
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            raise EntityNotFoundException("Project")
-
-        # Delete all existing answers and replace with new ones
-        db.query(OnboardingAnswer).filter(OnboardingAnswer.project_id == project_id).delete()
-
-        updated_answers = []
-        for ans in answers:
-            db_answer = OnboardingAnswer(
-                project_id=project_id,
-                question=ans.question,
-                answer=ans.answer
-            )
-            db.add(db_answer)
-            updated_answers.append(db_answer)
-
+    def update_answers(self, db: Session, project: Project, answers: list[OnboardingAnswerCreate]):
+        """
+        Saves several answers with a single INSERT ... ON CONFLICT (project_id, question)
+        DO UPDATE and returns the saved rows. Questions not sent are left untouched. Plan
+        sections fed by answers whose text changed are marked dirty in the same transaction.
+        """
+        statement = upsert_answers_statement(project.id, answers)
+        if statement is None:
+            return []
+        saved = db.execute(statement).all()
+        self._mark_plan_sections_dirty(db, project.id, [row.question for row in saved if row.previous_answer != row.answer])
         db.commit()
-        return updated_answers
+        return saved
         
-    def complete_onboarding(self, db: Session, project_id: UUID, background_tasks: BackgroundTasks):
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            raise EntityNotFoundException("Project")
-            
+    def complete_onboarding(self, db: Session, project: Project, mode: GenerationMode = GenerationMode.FULL,
+                            access_level: Optional[str] = None, idempotency_key: Optional[str] = None,
+                            before_commit: Optional[Callable[[], None]] = None):
+        """
+        `project` comes from the caller's ownership check, so it is not loaded again here.
+        `access_level` of the owner sets the job's scheduling weight.
+
+        Generation is single-flight per project: while a job is queued or running, a request
+        with the same mode and answers gets that job back instead of starting another, and
+        one with different inputs is refused (409). A repeated `idempotency_key` returns the
+        job it created. `before_commit` runs only once a new job has been inserted, after the
+        unique indexes settled any race (the router charges the generation rate limit there),
+        so replays and requests that lose a race cost nothing; if it raises, nothing is saved.
+        """
+        project_id, user_id = project.id, project.user_id
+        if idempotency_key:
+            job = self.job_service.get_by_idempotency_key(db, user_id, idempotency_key)
+            if job:
+                return reuse_idempotent_job(job, project_id)
+
+        if mode == GenerationMode.DIRTY_SECTIONS:
+            plan = db.query(BusinessPlan).filter(BusinessPlan.project_id == project_id).first()
+            if not plan or not plan.content_markdown:
+                # Nothing to patch yet
+                mode = GenerationMode.FULL
+            elif not plan.dirty_sections:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No onboarding answers changed since the plan was generated."
+                )
+
+        input_hash = generation_input_hash(mode, db.execute(answers_query(project_id)).all())
+        active = self.job_service.get_active(db, project_id)
+        if active:
+            return reuse_active_job(active, input_hash)
+
+        # Status change and job are committed together by enqueue, so a project is
+        # never left GENERATING without a job for the worker to pick up.
         project.status = ProjectStatus.GENERATING.value
-        db.commit()
-        
-        user_email = project.user.email if project.user else ""
-        user_name = project.user.name if project.user else ""
-
-        background_tasks.add_task(
-            self.business_plan_service.generate_plan_background_task,
-            project.id,
-            user_email,
-            user_name
-        )
-        
-        return True
+        try:
+            return self.job_service.enqueue(db, project_id, user_id, mode, access_level, input_hash, idempotency_key, before_commit)
+        except IntegrityError:
+            # A concurrent request enqueued first: resolve against its job
+            db.rollback()
+            if idempotency_key:
+                job = self.job_service.get_by_idempotency_key(db, user_id, idempotency_key)
+                if job:
+                    return reuse_idempotent_job(job, project_id)
+            active = self.job_service.get_active(db, project_id)
+            if not active:
+                raise
+            return reuse_active_job(active, input_hash)
+
+    def _mark_plan_sections_dirty(self, db: Session, project_id: UUID, question_labels: list[str]):
+        """Flags the plan sections fed by the given answers for regeneration (see ONBOARDING_QUESTION_SECTIONS)."""
+        sections = sections_for_questions(question_labels)
+        if not sections:
+            return
+        plan = db.query(BusinessPlan).filter(BusinessPlan.project_id == project_id).first()
+        if plan:
+            plan.dirty_sections = sorted(set(plan.dirty_sections or []) | sections)
+
+class AsyncOnboardingService:
+    """OnboardingService on an AsyncSession (ASYNC_DB=true)."""
+
+    def __init__(self):
+        self.job_service = JobService()
+
+    async def get_answers(self, db: AsyncSession, project: Project):
+        return (await db.scalars(select(OnboardingAnswer).where(OnboardingAnswer.project_id == project.id))).all()
+
+    async def update_single_answer(self, db: AsyncSession, project_id: UUID, question_label: str, new_answer: str):
+        answer = await db.scalar(select(OnboardingAnswer).where(
+            OnboardingAnswer.project_id == project_id,
+            OnboardingAnswer.question == question_label
+        ))
+        if not answer:
+            raise EntityNotFoundException("Onboarding Answer")
+        if answer.answer != new_answer:
+            answer.answer = new_answer
+            await self._mark_plan_sections_dirty(db, project_id, [question_label])
+        await db.commit()
+        return answer
+
+    async def update_answers(self, db: AsyncSession, project: Project, answers: list[OnboardingAnswerCreate]):
+        statement = upsert_answers_statement(project.id, answers)
+        if statement is None:
+            return []
+        saved = (await db.execute(statement)).all()
+        await self._mark_plan_sections_dirty(db, project.id, [row.question for row in saved if row.previous_answer != row.answer])
+        await db.commit()
+        return saved
+
+    async def complete_onboarding(self, db: AsyncSession, project: Project, mode: GenerationMode = GenerationMode.FULL,
+                                  access_level: Optional[str] = None, idempotency_key: Optional[str] = None,
+                                  before_commit: Optional[Callable[[], Awaitable[None]]] = None):
+        project_id, user_id = project.id, project.user_id
+        if idempotency_key:
+            job = await self.job_service.get_by_idempotency_key_async(db, user_id, idempotency_key)
+            if job:
+                return reuse_idempotent_job(job, project_id)
+
+        if mode == GenerationMode.DIRTY_SECTIONS:
+            plan = (await db.execute(
+                select(BusinessPlan.content_markdown, BusinessPlan.dirty_sections).where(BusinessPlan.project_id == project_id)
+            )).first()
+            if not plan or not plan.content_markdown:
+                # Nothing to patch yet
+                mode = GenerationMode.FULL
+            elif not plan.dirty_sections:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No onboarding answers changed since the plan was generated."
+                )
+
+        input_hash = generation_input_hash(mode, (await db.execute(answers_query(project_id))).all())
+        active = await self.job_service.get_active_async(db, project_id)
+        if active:
+            return reuse_active_job(active, input_hash)
+
+        # Committed together with the job, as in OnboardingService.complete_onboarding
+        project.status = ProjectStatus.GENERATING.value
+        try:
+            return await self.job_service.enqueue_async(db, project_id, user_id, mode, access_level, input_hash, idempotency_key, before_commit)
+        except IntegrityError:
+            await db.rollback()
+            if idempotency_key:
+                job = await self.job_service.get_by_idempotency_key_async(db, user_id, idempotency_key)
+                if job:
+                    return reuse_idempotent_job(job, project_id)
+            active = await self.job_service.get_active_async(db, project_id)
+            if not active:
+                raise
+            return reuse_active_job(active, input_hash)
+
+    async def _mark_plan_sections_dirty(self, db: AsyncSession, project_id: UUID, question_labels: list[str]):
+        sections = sections_for_questions(question_labels)
+        if not sections:
+            return
+        plan = await db.scalar(select(BusinessPlan).where(BusinessPlan.project_id == project_id))
+        if plan:
+            plan.dirty_sections = sorted(set(plan.dirty_sections or []) | sections)
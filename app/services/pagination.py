@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class KeysetPage:
+    """
+    Keyset (cursor) pagination over `(created_at, id)`, newest first.
+
+    The cursor is the position of the last row of the previous page, so every page is an
+    index range scan on (owner, created_at, id): the cost does not grow with the page
+    number or with how many rows the owner has, and no total count is computed.
+    `fields` restricts the selected columns to the ones the client asked for.
+    """
+    def __init__(self, model, allowed_fields: Iterable[str], fields: Optional[str] = None,
+                 cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE):
+        self.model = model
+        self.fields = self._parse_fields(list(allowed_fields), fields)
+        self.cursor = self._decode_cursor(cursor) if cursor else None
+        self.limit = limit
+
+    def query(self, *criteria):
+        model = self.model
+        # created_at and id are always read: the next cursor is built from them
+        columns = {name: getattr(model, name) for name in (*self.fields, "created_at", "id")}
+        query = select(*columns.values()).where(*criteria)
+        if self.cursor:
+            query = query.where(tuple_(model.created_at, model.id) < tuple_(*self.cursor))
+        # One extra row tells us whether there is a next page
+        return query.order_by(model.created_at.desc(), model.id.desc()).limit(self.limit + 1)
+
+    def build(self, rows) -> dict:
+        rows = list(rows)
+        next_cursor = None
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            next_cursor = self._encode_cursor(rows[-1].created_at, rows[-1].id)
+        return {
+            "items": [{name: row._mapping[name] for name in self.fields} for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    def _parse_fields(self, allowed: list[str], fields: Optional[str]) -> list[str]:
+        if not fields:
+            return allowed
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+            )
+        return list(dict.fromkeys(requested))
+
+    def _encode_cursor(self, created_at: datetime, id: UUID) -> str:
+        raw = json.dumps([created_at.isoformat(), str(id)]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def _decode_cursor(self, cursor: str):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, id = json.loads(raw)
+            return datetime.fromisoformat(created_at), UUID(id)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
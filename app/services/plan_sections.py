@@ -0,0 +1,203 @@
+import re
+from typing import Dict, Iterable
+
+class PlanSection:
+    def __init__(self, number: int, title: str, template: str):
+        self.number = number
+        self.title = title
+        self.template = template
+
+# Structure every business plan follows. Each template is the section heading plus the
+# guidance the model gets for writing it; the full-plan prompt and the per-section
+# prompts are both built from these.
+PLAN_SECTIONS = [
+    PlanSection(1, "Resumo Executivo", """# 1. Resumo Executivo
+Resumo geral da startup, sintetizando problema, solução, proposta de valor, público-alvo, modelo de negócio e diferenciais.
+
+## 1.1 Apresentação da Startup  
+Caracterização clara da empresa, propósito, setor e proposta principal.
+
+## 1.2 Problema e Oportunidade  
+Descrição da dor ou necessidade do mercado e o potencial da oportunidade identificada.
+
+## 1.3 Proposta de Valor  
+Benefício central entregue ao cliente e resultado gerado.
+
+## 1.4 Modelo de Negócio  
+Como a empresa cria, entrega e captura valor.
+
+## 1.5 Diferenciais Competitivos  
+Vantagens únicas, barreiras à entrada e diferenciação no setor.
+"""),
+    PlanSection(2, "Análise de Mercado", """# 2. Análise de Mercado
+Avaliação do ambiente de atuação, incluindo tamanho do mercado, tendências, comportamento do consumidor e competitividade.
+
+## 2.1 Panorama do Setor  
+Contexto geral, relevância econômica e características essenciais.
+
+## 2.2 Tendências Relevantes  
+Movimentos tecnológicos, sociais e econômicos que influenciam o setor.
+
+## 2.3 Segmentação e Público-Alvo  
+Identificação dos grupos de clientes e definição do público prioritário.
+
+## 2.4 Comportamento do Cliente  
+Fatores culturais, sociais e psicológicos que afetam decisões de compra.
+
+## 2.5 Mapeamento da Concorrência  
+Concorrentes diretos e indiretos, comparações e análise competitiva.
+
+## 2.6 Oportunidades de Mercado  
+Lacunas, nichos e tendências que a startup pode aproveitar.
+"""),
+    PlanSection(3, "Produto e Solução", """# 3. Produto e Solução
+Descrição completa do produto/serviço, estágio, funcionalidade e inovação.
+
+## 3.1 O Problema  
+A dor real do mercado e suas implicações.
+
+## 3.2 A Solução Proposta  
+Descrição prática da solução e funcionamento.
+
+## 3.3 Estágio de Desenvolvimento  
+Ideia, protótipo, MVP, beta ou operação.
+
+## 3.4 Funcionalidades-Chave  
+Principais recursos que compõem a solução.
+
+## 3.5 Inovação e Diferenciais  
+Elementos de inovação e impacto positivo frente à concorrência.
+"""),
+    PlanSection(4, "Modelo de Negócio", """# 4. Modelo de Negócio
+Explicação clara da lógica de funcionamento, monetização e canais.
+
+## 4.1 Estrutura de Monetização  
+Como a startup gera receita.
+
+## 4.2 Canais de Aquisição e Distribuição  
+Canais digitais, vendas diretas, parceiros, etc.
+
+## 4.3 Relacionamento com Clientes  
+Suporte, atendimento, experiência e fidelização.
+
+## 4.4 Estratégia de Crescimento (Go-to-Market)  
+Como a empresa entra no mercado e escala.
+"""),
+    PlanSection(5, "Operações e Equipe", """# 5. Operações e Equipe
+Estrutura, papéis, processos operacionais e futuras contratações.
+
+## 5.1 Estrutura Organizacional  
+Organograma, níveis e especializações.
+
+## 5.2 Papéis e Responsabilidades  
+Competências e contribuições de cada membro.
+
+## 5.3 Processos Operacionais  
+Fluxo de desenvolvimento, entrega e manutenção.
+
+## 5.4 Plano de Expansão da Equipe  
+Contratações futuras conforme crescimento.
+"""),
+    PlanSection(6, "Planejamento Estratégico", """# 6. Planejamento Estratégico
+Ferramentas para orientar decisões e posicionamento.
+
+## 6.1 Análise SWOT  
+Forças, fraquezas, oportunidades e ameaças.
+
+## 6.2 Análise PESTEL  
+Fatores Políticos, Econômicos, Sociais, Tecnológicos, Ecológicos e Legais.
+
+## 6.3 Direcionadores Estratégicos  
+Prioridades, metas e visão de longo prazo.
+
+## 6.4 Roadmap de Desenvolvimento  
+Plano para 12, 24 e 36 meses, incluindo marcos.
+"""),
+    PlanSection(7, "Plano Financeiro", """# 7. Plano Financeiro
+Demonstrações, projeções e viabilidade econômica.
+
+## 7.1 Estrutura de Custos  
+Custos fixos, variáveis e operacionais.
+
+## 7.2 Premissas Financeiras  
+Principais critérios usados nas projeções.
+
+## 7.3 Projeção de Receitas  
+Estimativa de faturamento.
+
+## 7.4 Projeção de Despesas  
+Estimativa de gastos e investimentos operacionais.
+
+## 7.5 Ponto de Equilíbrio  
+Quando a empresa cobre seus custos.
+
+## 7.6 Rentabilidade Estimada  
+ROI, margem e potencial de retorno.
+
+## 7.7 Necessidade de Investimentos e Uso dos Recursos  
+Montante necessário e alocação planejada.
+"""),
+    PlanSection(8, "Sustentabilidade e ESG", """# 8. Sustentabilidade e ESG
+Impactos ambientais, sociais e práticas de governança.
+
+## 8.1 Impacto Ambiental  
+Sustentabilidade, pegada ecológica e práticas verdes.
+
+## 8.2 Impacto Social  
+Acessibilidade, impacto humano e benefícios sociais.
+
+## 8.3 Governança e Conformidade  
+Ética, transparência e compliance.
+"""),
+    PlanSection(9, "Riscos e Mitigações", """# 9. Riscos e Mitigações
+Identificação de riscos e estratégias de mitigação.
+
+## 9.1 Riscos de Mercado  
+Variações do setor, demanda e concorrência.
+
+## 9.2 Riscos Operacionais  
+Falhas internas, fornecedores e processos.
+
+## 9.3 Riscos Tecnológicos  
+Obsolescência e segurança cibernética.
+
+## 9.4 Estratégias de Mitigação  
+Como reduzir impactos e probabilidades.
+"""),
+    PlanSection(10, "Conclusão e Pitch Final", """# 10. Conclusão e Pitch Final
+Resumo final, reforço do propósito e mini-pitch de até 6 linhas, convincente e pronto para investidores.
+"""),
+]
+
+SECTION_NUMBERS = [section.number for section in PLAN_SECTIONS]
+
+# Sections scored by the advanced analysis (the closing pitch is not evaluated)
+ANALYZED_SECTION_NUMBERS = SECTION_NUMBERS[:9]
+
+# Top-level headings only ("# 7. Plano Financeiro"), not subsections ("## 7.1 ...")
+_SECTION_HEADING_RE = re.compile(r"^#{1,2}\s+(\d+)\.\s", re.MULTILINE)
+
+def get_section(number: int) -> PlanSection:
+    for section in PLAN_SECTIONS:
+        if section.number == number:
+            return section
+    raise ValueError(f"Unknown plan section {number}")
+
+def section_number_from_name(name: str):
+    """"7. Plano Financeiro" -> 7, as returned in the analysis `section_name`."""
+    match = re.match(r"\s*(\d+)", name or "")
+    return int(match.group(1)) if match else None
+
+def split_plan_sections(markdown: str) -> Dict[int, str]:
+    """Splits plan markdown into {section number: section markdown}, keyed by its top-level headings."""
+    matches = list(_SECTION_HEADING_RE.finditer(markdown or ""))
+    sections = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(markdown)
+        sections[int(match.group(1))] = markdown[match.start():end].strip()
+    return sections
+
+def join_plan_sections(sections: Dict[int, str], order: Iterable[int] = None) -> str:
+    """Stitches section markdown back together in plan order."""
+    order = order or sorted(sections)
+    return "\n\n".join(sections[number] for number in order if sections.get(number))
@@ -1,11 +1,242 @@
-from sqlalchemy.orm import Session
-from app.models import BusinessPlan
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from fastapi import Response, status
+from sqlalchemy import case, false, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql import func
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models import BusinessPlan, Project, ProjectStatus
 from app.dependencies import EntityNotFoundException
 from uuid import UUID
 
 class PlanService:
-    def get_plan_by_project(self, db: Session, project_id: UUID):
-        plan = db.query(BusinessPlan).filter(BusinessPlan.project_id == project_id).first()
+    # Comment line sent while waiting for new content, so proxies keep the connection open
+    KEEPALIVE_SECONDS = 15
+    # Responses are per-user, and clients must revalidate (cheaply, via If-None-Match) before reuse
+    CACHE_CONTROL = "private, no-cache"
+    # GET /plan/markdown picks its encoding itself, so caches must key on Accept-Encoding
+    MARKDOWN_VARY = "Accept-Encoding"
+
+    def get_owned_plan(self, db: Session, project_id: UUID, user_id: UUID, with_sections: bool = False):
+        """
+        Loads the plan of a project owned by `user_id`, checking ownership in the same query
+        (and eager-loading the section analyses when asked), so a plan request costs one
+        round trip instead of project lookup + plan lookup + lazy sections load.
+        """
+        plan = db.execute(self._owned_plan_query(project_id, user_id, with_sections)).unique().scalar_one_or_none()
         if not plan:
+            # Only on a miss: tell a missing/foreign project apart from a project without a plan yet
+            if not db.execute(self._owned_project_query(project_id, user_id)).first():
+                raise EntityNotFoundException("Project")
             raise EntityNotFoundException("Business Plan")
         return plan
+
+    def get_owned_plan_markdown(self, db: Session, project_id: UUID, user_id: UUID, gzip_accepted: bool) -> Response:
+        """
+        The plan markdown as `text/markdown`. When the client accepts gzip and a pre-compressed
+        copy is stored (PLAN_STORE_COMPRESSED), those bytes are sent as they are and the
+        markdown itself is not even read.
+        """
+        row = db.execute(self._owned_markdown_query(project_id, user_id, gzip_accepted)).first()
+        if not row:
+            if not db.execute(self._owned_project_query(project_id, user_id)).first():
+                raise EntityNotFoundException("Project")
+            raise EntityNotFoundException("Business Plan")
+        return self._markdown_response(row)
+
+    def get_owned_plan_etag(self, db: Session, project_id: UUID, user_id: UUID) -> Optional[str]:
+        """
+        Current ETag of the plan, read without loading its content. None when there is no
+        such plan for this user; the caller then falls back to `get_owned_plan` for the 404.
+        """
+        row = db.execute(self._owned_plan_version_query(project_id, user_id)).first()
+        return self.plan_etag(row.id, row.updated_at) if row else None
+
+    def get_owned_markdown_etag(self, db: Session, project_id: UUID, user_id: UUID, gzip_accepted: bool) -> Optional[str]:
+        """ETag of the representation `get_owned_plan_markdown` would send, read without the content."""
+        row = db.execute(self._owned_markdown_version_query(project_id, user_id, gzip_accepted)).first()
+        return self._markdown_etag(row) if row else None
+
+    def plan_etag(self, plan_id: UUID, updated_at: datetime, encoding: Optional[str] = None) -> str:
+        """
+        Strong ETag: every write to the plan or its sections bumps `updated_at`. Byte-different
+        representations of the same version (e.g. the stored gzip copy) get their own `encoding` suffix.
+        """
+        version = f"{plan_id.hex}-{int(updated_at.timestamp() * 1_000_000)}"
+        return f'"{version}-{encoding}"' if encoding else f'"{version}"'
+
+    def etag_matches(self, if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in candidates
+
+    def not_modified(self, etag: str, vary: Optional[str] = None) -> Response:
+        headers = {"ETag": etag, "Cache-Control": self.CACHE_CONTROL}
+        if vary:
+            headers["Vary"] = vary
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    def _markdown_etag(self, row) -> str:
+        return self.plan_etag(row.id, row.updated_at, "gzip" if row.gzipped else None)
+
+    def _markdown_response(self, row) -> Response:
+        headers = {"ETag": self._markdown_etag(row), "Cache-Control": self.CACHE_CONTROL, "Vary": self.MARKDOWN_VARY}
+        if row.gzipped:
+            # Already encoded, so CompressionMiddleware passes it through untouched
+            headers["Content-Encoding"] = "gzip"
+            return Response(row.content_markdown_gzip, media_type="text/markdown", headers=headers)
+        return Response(row.content_markdown or "", media_type="text/markdown", headers=headers)
+
+    def set_cache_headers(self, response: Response, plan: BusinessPlan):
+        response.headers["ETag"] = self.plan_etag(plan.id, plan.updated_at)
+        response.headers["Cache-Control"] = self.CACHE_CONTROL
+
+    async def stream_plan_events(self, project_id: UUID, offset: int = 0) -> AsyncIterator[str]:
+        """
+        Server-Sent Events for a plan being generated.
+
+        Polls the plan draft (which the worker appends to while streaming from the LLM, or
+        the saved plan when no draft is being written) and emits only the markdown past
+        `offset`. Each `chunk` event carries its end offset as the event id, so a
+        reconnecting client resumes via `Last-Event-ID`. A `reset` event means a new
+        generation attempt started from an empty draft, or a failed one was dropped.
+        The stream ends with a `done` event once the project leaves GENERATING.
+        """
+        idle = 0.0
+        while True:
+            status, length, text = await self._fetch_plan_progress(project_id, offset)
+
+            if length < offset:
+                offset = 0
+                yield self._sse("reset", {})
+                continue
+
+            if text:
+                offset += len(text)
+                idle = 0.0
+                yield self._sse("chunk", {"text": text}, event_id=offset)
+            elif idle >= self.KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
+
+            if status != ProjectStatus.GENERATING.value:
+                yield self._sse("done", {"status": status})
+                return
+
+            await asyncio.sleep(settings.PLAN_STREAM_POLL_SECONDS)
+            idle += settings.PLAN_STREAM_POLL_SECONDS
+
+    async def _fetch_plan_progress(self, project_id: UUID, offset: int):
+        return await asyncio.to_thread(self._read_plan_progress, project_id, offset)
+
+    def _read_plan_progress(self, project_id: UUID, offset: int):
+        """Returns (project status, plan length, markdown after offset) in one short query."""
+        db = SessionLocal()
+        try:
+            row = db.execute(self._plan_progress_query(project_id, offset)).first()
+        finally:
+            db.close()
+        if not row:
+            return None, 0, None
+        return row[0], row[1], row[2]
+
+    def _owned_plan_query(self, project_id: UUID, user_id: UUID, with_sections: bool):
+        query = select(BusinessPlan).join(Project, Project.id == BusinessPlan.project_id).where(
+            BusinessPlan.project_id == project_id,
+            Project.user_id == user_id,
+        )
+        if with_sections:
+            query = query.options(joinedload(BusinessPlan.sections))
+        return query
+
+    def _owned_plan_version_query(self, project_id: UUID, user_id: UUID):
+        return select(BusinessPlan.id, BusinessPlan.updated_at).join(Project, Project.id == BusinessPlan.project_id).where(
+            BusinessPlan.project_id == project_id,
+            Project.user_id == user_id,
+        )
+
+    def _owned_markdown_query(self, project_id: UUID, user_id: UUID, gzip_accepted: bool):
+        if gzip_accepted:
+            gzipped = BusinessPlan.content_markdown_gzip
+            markdown = case((gzipped.is_(None), BusinessPlan.content_markdown), else_=null())
+        else:
+            gzipped, markdown = null(), BusinessPlan.content_markdown
+        return select(
+            BusinessPlan.id,
+            BusinessPlan.updated_at,
+            gzipped.label("content_markdown_gzip"),
+            markdown.label("content_markdown"),
+            self._gzipped_flag(gzip_accepted),
+        ).join(Project, Project.id == BusinessPlan.project_id).where(
+            BusinessPlan.project_id == project_id,
+            Project.user_id == user_id,
+        )
+
+    def _owned_markdown_version_query(self, project_id: UUID, user_id: UUID, gzip_accepted: bool):
+        return self._owned_plan_version_query(project_id, user_id).add_columns(self._gzipped_flag(gzip_accepted))
+
+    def _gzipped_flag(self, gzip_accepted: bool):
+        """Whether the stored gzip copy is what gets sent."""
+        flag = BusinessPlan.content_markdown_gzip.is_not(None) if gzip_accepted else false()
+        return flag.label("gzipped")
+
+    def _owned_project_query(self, project_id: UUID, user_id: UUID):
+        return select(Project.id).where(Project.id == project_id, Project.user_id == user_id)
+
+    def _plan_progress_query(self, project_id: UUID, offset: int):
+        markdown = func.coalesce(BusinessPlan.draft_markdown, BusinessPlan.content_markdown)
+        return select(
+            Project.status,
+            func.coalesce(func.length(markdown), 0),
+            func.substr(markdown, offset + 1),
+        ).outerjoin(BusinessPlan, BusinessPlan.project_id == Project.id).where(
+            Project.id == project_id
+        )
+
+    def _sse(self, event: str, data: dict, event_id: int = None) -> str:
+        message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        if event_id is not None:
+            message = f"id: {event_id}\n" + message
+        return message
+
+class AsyncPlanService(PlanService):
+    """PlanService on an AsyncSession (ASYNC_DB=true); the SSE stream polls through asyncpg too."""
+
+    async def get_owned_plan(self, db: AsyncSession, project_id: UUID, user_id: UUID, with_sections: bool = False):
+        plan = (await db.execute(self._owned_plan_query(project_id, user_id, with_sections))).unique().scalar_one_or_none()
+        if not plan:
+            if not (await db.execute(self._owned_project_query(project_id, user_id))).first():
+                raise EntityNotFoundException("Project")
+            raise EntityNotFoundException("Business Plan")
+        return plan
+
+    async def get_owned_plan_markdown(self, db: AsyncSession, project_id: UUID, user_id: UUID, gzip_accepted: bool) -> Response:
+        row = (await db.execute(self._owned_markdown_query(project_id, user_id, gzip_accepted))).first()
+        if not row:
+            if not (await db.execute(self._owned_project_query(project_id, user_id))).first():
+                raise EntityNotFoundException("Project")
+            raise EntityNotFoundException("Business Plan")
+        return self._markdown_response(row)
+
+    async def get_owned_plan_etag(self, db: AsyncSession, project_id: UUID, user_id: UUID) -> Optional[str]:
+        row = (await db.execute(self._owned_plan_version_query(project_id, user_id))).first()
+        return self.plan_etag(row.id, row.updated_at) if row else None
+
+    async def get_owned_markdown_etag(self, db: AsyncSession, project_id: UUID, user_id: UUID, gzip_accepted: bool) -> Optional[str]:
+        row = (await db.execute(self._owned_markdown_version_query(project_id, user_id, gzip_accepted))).first()
+        return self._markdown_etag(row) if row else None
+
+    async def _fetch_plan_progress(self, project_id: UUID, offset: int):
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(self._plan_progress_query(project_id, offset))).first()
+        if not row:
+            return None, 0, None
+        return row[0], row[1], row[2]
@@ -1,8 +1,11 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.models import Project, ProjectStatus, OnboardingAnswer
-from app.schemas.projects import ProjectCreate, ProjectUpdate
+from app.schemas.projects import ProjectCreate, ProjectResponse, ProjectUpdate
 from app.dependencies import EntityNotFoundException
+from app.services.pagination import DEFAULT_PAGE_SIZE, KeysetPage
 from uuid import UUID
 
 # Fixed onboarding questions — must stay in sync with the frontend constant
@@ -19,6 +22,27 @@ ONBOARDING_QUESTIONS = [
     "cost_structure",
 ]
 
+# Plan sections (numbers from app.services.plan_sections) written from each onboarding answer.
+# Changing an answer marks these sections dirty so they can be regenerated on their own.
+ONBOARDING_QUESTION_SECTIONS = {
+    "problem": [1, 2, 3, 10],
+    "proposed_solution": [1, 3, 4, 10],
+    "product_stage": [3, 6, 9],
+    "value_proposition": [1, 3, 4, 10],
+    "competitive_advantage": [1, 2, 3, 9],
+    "team_structure": [5],
+    "key_roles": [5],
+    "location": [2, 5, 8],
+    "available_capital": [7, 9],
+    "cost_structure": [7],
+}
+
+def sections_for_questions(question_labels) -> set[int]:
+    sections = set()
+    for label in question_labels:
+        sections.update(ONBOARDING_QUESTION_SECTIONS.get(label, []))
+    return sections
+
 class ProjectService:
     def create_project(self, db: Session, project: ProjectCreate, user_id: UUID):
         existing_project = db.query(Project).filter(
@@ -54,8 +78,9 @@ class ProjectService:
         db.refresh(db_project)
         return db_project
 
-    def get_projects(self, db: Session, user_id: UUID):
-        return db.query(Project).filter(Project.user_id == user_id).all()
+    def get_projects(self, db: Session, user_id: UUID, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, fields: str = None):
+        page = KeysetPage(Project, ProjectResponse.model_fields, fields, cursor, limit)
+        return page.build(db.execute(page.query(Project.user_id == user_id)))
 
     def get_project(self, db: Session, project_id: UUID, user_id: UUID):
         project = db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
@@ -75,3 +100,53 @@ class ProjectService:
             db.commit()
             db.refresh(project)
         return project
+
+class AsyncProjectService:
+    """ProjectService on an AsyncSession (ASYNC_DB=true)."""
+
+    async def create_project(self, db: AsyncSession, project: ProjectCreate, user_id: UUID):
+        existing_project = await db.scalar(select(Project.id).where(
+            Project.user_id == user_id,
+            Project.name == project.name
+        ))
+
+        if existing_project:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A project with this name already exists."
+            )
+
+        db_project = Project(
+            name=project.name,
+            description=project.description,
+            main_sector=project.main_sector,
+            business_model=project.business_model,
+            user_id=user_id
+        )
+        db.add(db_project)
+        await db.flush()  # Get project ID before commit
+
+        # Pre-populate the 10 fixed onboarding answers with empty strings
+        db.add_all([
+            OnboardingAnswer(project_id=db_project.id, question=question_label, answer="")
+            for question_label in ONBOARDING_QUESTIONS
+        ])
+
+        await db.commit()
+        await db.refresh(db_project)
+        return db_project
+
+    async def get_projects(self, db: AsyncSession, user_id: UUID, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, fields: str = None):
+        page = KeysetPage(Project, ProjectResponse.model_fields, fields, cursor, limit)
+        return page.build(await db.execute(page.query(Project.user_id == user_id)))
+
+    async def get_project(self, db: AsyncSession, project_id: UUID, user_id: UUID):
+        project = await db.scalar(select(Project).where(Project.id == project_id, Project.user_id == user_id))
+        if not project:
+            raise EntityNotFoundException("Project")
+        return project
+
+    async def delete_project(self, db: AsyncSession, project_id: UUID, user_id: UUID):
+        project = await self.get_project(db, project_id, user_id)
+        await db.delete(project)
+        await db.commit()
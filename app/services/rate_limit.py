@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from app.cache import MemoryCache
+from app.config import settings
+from app.metrics import RATE_LIMITED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    """"5/hour" -> (bucket capacity 5, refill rate in tokens per second)."""
+    count, _, period = spec.partition("/")
+    capacity = int(count)
+    seconds = _PERIODS[period.strip().rstrip("s")]
+    return capacity, capacity / seconds
+
+class MemoryRateLimitBackend:
+    """Token buckets in this process. Idle buckets expire once they would be full again."""
+    shared = False
+
+    def __init__(self, max_entries: int):
+        self._buckets = MemoryCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets.set(key, (tokens, now), ttl=capacity / rate)
+            return wait
+
+# Refill and take in one atomic step, on the Redis clock so instances need not agree on time.
+# The wait is returned as a string: Lua numbers become integers in Redis replies.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+class RedisRateLimitBackend:
+    """Token buckets shared by every instance, on Redis (`pip install redis`)."""
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[capacity, rate]))
+
+class RateLimiter:
+    """
+    Per-user token buckets, one per route, sized by the user's access level and the
+    route's scope (RATE_LIMITS). Access levels without a limit for a scope are not limited.
+    If the backend fails the request is let through: an outage of the shared store
+    should not take the API down with it.
+    """
+    def __init__(self, backend, limits: Dict[str, Dict[str, str]], default_tier: str):
+        self.backend = backend
+        self.limits = {
+            tier: {scope: parse_limit(spec) for scope, spec in scopes.items()}
+            for tier, scopes in limits.items()
+        }
+        self.default_tier = default_tier
+
+    def limit_for(self, access_level: Optional[str], scope: str) -> Optional[Tuple[int, float]]:
+        tier = access_level if access_level in self.limits else self.default_tier
+        return self.limits.get(tier, {}).get(scope)
+
+    def check(self, user_id: UUID, access_level: Optional[str], scope: str, route: str) -> float:
+        """Takes a token. Returns 0 when the request may proceed, else the seconds until it may be retried."""
+        limit = self.limit_for(access_level, scope)
+        if not limit:
+            return 0.0
+        try:
+            wait = self.backend.take(f"{user_id}:{scope}:{route}", *limit)
+        except Exception as e:
+            logger.warning(f"Rate limit check failed, letting the request through: {e}")
+            return 0.0
+        if wait > 0:
+            RATE_LIMITED_REQUESTS.labels(scope, access_level or self.default_tier).inc()
+        return wait
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Returns the configured limiter, or None when RATE_LIMIT_BACKEND is "none"."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        backend = RedisRateLimitBackend(settings.REDIS_URL)
+    elif settings.RATE_LIMIT_BACKEND == "memory":
+        backend = MemoryRateLimitBackend(max_entries=settings.RATE_LIMIT_MAX_ENTRIES)
+    else:
+        return None
+    return RateLimiter(backend, settings.RATE_LIMITS, settings.RATE_LIMIT_DEFAULT_TIER)
+
+rate_limiter = get_rate_limiter()
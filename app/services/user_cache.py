@@ -0,0 +1,77 @@
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlalchemy.orm import make_transient_to_detached
+from app.cache import MemoryCache, RedisCache
+from app.config import settings
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in the cache. The password hash is left out: it is only needed at login,
+# which looks the user up by email anyway.
+CACHED_USER_COLUMNS = ("id", "name", "email", "is_active", "access_level", "created_at")
+
+class UserCache:
+    """
+    Authenticated users keyed by id, so `get_current_user` does not query `users` on
+    every request. Entries live for USER_CACHE_TTL_SECONDS and are dropped explicitly
+    when a user is deleted. Code that changes a cached column (e.g. `access_level`) must
+    call `invalidate_user`, or the old value is served until the entry expires.
+
+    Cached users are rebuilt as detached `User` instances; callers attach them to their
+    session with `Session.merge(user, load=False)`, which does not hit the database.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get(self, user_id: UUID) -> Optional[User]:
+        try:
+            values = self.backend.get(str(user_id))
+        except Exception as e:
+            logger.warning(f"User cache lookup failed: {e}")
+            return None
+        if values is None:
+            return None
+
+        # Shared backends hand back JSON, so restore the non-JSON types
+        values = dict(values)
+        values["id"] = UUID(str(values["id"]))
+        if isinstance(values.get("created_at"), str):
+            values["created_at"] = datetime.fromisoformat(values["created_at"])
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User):
+        try:
+            self.backend.set(str(user.id), {column: getattr(user, column) for column in CACHED_USER_COLUMNS})
+        except Exception as e:
+            logger.warning(f"User cache write failed: {e}")
+
+    def invalidate(self, user_id: UUID):
+        try:
+            self.backend.delete(str(user_id))
+        except Exception as e:
+            logger.warning(f"User cache delete failed: {e}")
+
+def get_user_cache() -> Optional[UserCache]:
+    """Returns the configured cache, or None when USER_CACHE_BACKEND is "none"."""
+    ttl = settings.USER_CACHE_TTL_SECONDS
+    if settings.USER_CACHE_BACKEND == "redis":
+        return UserCache(RedisCache(settings.REDIS_URL, prefix="user:", default_ttl=ttl))
+    if settings.USER_CACHE_BACKEND == "memory":
+        return UserCache(MemoryCache(max_entries=settings.USER_CACHE_MAX_ENTRIES, default_ttl=ttl))
+    return None
+
+user_cache = get_user_cache()
+
+# Decoded access tokens (token -> user id), so a token is verified once per process and
+# not on every request. Entries never outlive the token's own expiry.
+token_cache = MemoryCache(max_entries=settings.USER_CACHE_MAX_ENTRIES, default_ttl=settings.USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: UUID):
+    if user_cache:
+        user_cache.invalidate(user_id)
@@ -0,0 +1,136 @@
+"""
+Plan generation worker.
+
+Run one or more of these next to the API:
+
+    python -m app.worker --concurrency 4
+
+Each worker polls the `generation_jobs` table and runs up to `--concurrency`
+generations at a time. Workers coordinate only through the database, so they
+can be scaled across processes and nodes independently of the API.
+Each worker serves its Prometheus metrics on `--metrics-port` (WORKER_METRICS_PORT).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import start_http_server
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import GENERATION_FAILURES, GENERATIONS_IN_PROGRESS
+from app.models import GenerationMode
+from app.services.business_plans import BusinessPlanService
+from app.services.jobs import JobService
+from app.services.llm_cache import DatabaseCacheBackend, llm_cache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+class GenerationWorker:
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.job_service = JobService()
+        self.business_plan_service = BusinessPlanService()
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        if not self._stopping.is_set():
+            logger.info("Stopping worker, waiting for running jobs to finish...")
+            self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+        if llm_cache and isinstance(llm_cache.backend, DatabaseCacheBackend):
+            purged = await asyncio.to_thread(llm_cache.backend.purge_expired)
+            logger.info(f"Purged {purged} expired LLM cache entries")
+        await asyncio.gather(*(self._slot() for _ in range(self.concurrency)))
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _slot(self):
+        while not self._stopping.is_set():
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"Failed to claim job: {e}", exc_info=True)
+                job = None
+
+            if job is None:
+                await self._sleep(self.poll_interval)
+                continue
+
+            await self._run_job(job)
+
+    async def _run_job(self, job):
+        logger.info(f"Running job {job.id} for project {job.project_id} (attempt {job.attempts}/{job.max_attempts})")
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            with GENERATIONS_IN_PROGRESS.track_inprogress():
+                await self.business_plan_service.generate_plan(job.project_id, GenerationMode(job.mode))
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+            GENERATION_FAILURES.labels(type(e).__name__).inc()
+            await asyncio.to_thread(self._with_session, self.job_service.mark_failed, job.id, self.worker_id, str(e))
+        else:
+            await asyncio.to_thread(self._with_session, self.job_service.mark_succeeded, job.id, self.worker_id)
+            logger.info(f"Job {job.id} succeeded")
+            if llm_cache:
+                logger.info(f"LLM cache stats: {llm_cache.stats()}")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id):
+        """Keeps the lease alive while a long generation is running."""
+        interval = settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await asyncio.to_thread(self._with_session, self.job_service.heartbeat, job_id, self.worker_id):
+                    logger.warning(f"Lost lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Heartbeat failed for job {job_id}: {e}")
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _claim(self):
+        return self._with_session(self.job_service.claim, self.worker_id)
+
+    def _with_session(self, fn, *args):
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+async def main(concurrency: int, poll_interval: float, metrics_port: int):
+    if metrics_port:
+        start_http_server(metrics_port)
+        logger.info(f"Serving metrics on :{metrics_port}/metrics")
+    worker = GenerationWorker(concurrency, poll_interval)
+    loop = asyncio.get_running_loop()
+    # Every slot plus its heartbeat may be waiting on a thread at the same time
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 2 + 2))
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Business plan generation worker")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL_SECONDS)
+    parser.add_argument("--metrics-port", type=int, default=settings.WORKER_METRICS_PORT, help="0 disables the metrics endpoint")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.poll_interval, args.metrics_port))
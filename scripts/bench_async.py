@@ -0,0 +1,100 @@
+"""
+Sync vs async stack load benchmark.
+
+Drives the same read workload against two running APIs, one started with ASYNC_DB=false
+(the default sync stack) and one with ASYNC_DB=true, and reports requests/s and latency
+for each. Every request is authenticated and reads the database: the project list, a
+project, and its onboarding answers, in rotation.
+
+    ASYNC_DB=false uvicorn app.main:app --port 8000
+    ASYNC_DB=true uvicorn app.main:app --port 8001
+    python scripts/bench_async.py --sync-url http://localhost:8000 --async-url http://localhost:8001 \\
+        --concurrency 64 --requests 4000
+
+Pass only one of the URLs to measure a single stack. Needs httpx
+(`pip install -r requirements-dev.txt`). It registers a throwaway user and a few projects
+on each API first (both may share a database).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import httpx
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+async def setup(client, projects: int):
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    password = "bench-password"
+    (await client.post("/auth/register", json={"email": email, "name": "Bench", "password": password})).raise_for_status()
+    login = await client.post("/auth/login", data={"username": email, "password": password})
+    login.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+    ids = []
+    for i in range(projects):
+        response = await client.post("/projects", json={
+            "name": f"Bench {i}", "description": "Benchmark project",
+            "main_sector": "Logística", "business_model": "B2B",
+        })
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+async def worker(client, queue, paths, latencies, errors):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        response = await client.get(paths[i % len(paths)])
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        latencies.append(time.perf_counter() - started)
+
+async def run(base_url: str, concurrency: int, total: int, projects: int):
+    # Below uvicorn's 5s keep-alive timeout, so a pooled connection is not reused as the server closes it
+    limits = httpx.Limits(max_connections=concurrency, keepalive_expiry=2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        ids = await setup(client, projects)
+        paths = ["/projects?limit=50"]
+        for project_id in ids:
+            paths += [f"/projects/{project_id}", f"/projects/{project_id}/onboarding"]
+
+        # Warm up connections and pools before measuring
+        warmup = asyncio.Queue()
+        for i in range(concurrency):
+            warmup.put_nowait(i)
+        await asyncio.gather(*(worker(client, warmup, paths, [], []) for _ in range(concurrency)))
+
+        queue = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(i)
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, queue, paths, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return total / elapsed, latencies, errors
+
+async def main(stacks, concurrency: int, total: int, projects: int):
+    print(f"{total} requests, concurrency {concurrency}")
+    for name, base_url in stacks:
+        rps, latencies, errors = await run(base_url, concurrency, total, projects)
+        print(f"{name:<5} {rps:7.1f} req/s  p50 {statistics.median(latencies) * 1000:6.0f}ms"
+              f"  p99 {percentile(latencies, 99) * 1000:6.0f}ms  errors {len(errors)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Requests/s of the sync and async stacks")
+    parser.add_argument("--sync-url")
+    parser.add_argument("--async-url")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--projects", type=int, default=5)
+    args = parser.parse_args()
+    stacks = [(name, url) for name, url in (("sync", args.sync_url), ("async", args.async_url)) if url]
+    if not stacks:
+        parser.error("pass --sync-url and/or --async-url")
+    asyncio.run(main(stacks, args.concurrency, args.requests, args.projects))
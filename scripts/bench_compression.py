@@ -0,0 +1,113 @@
+"""
+Response compression benchmark.
+
+Requests the same routes from a running API with each Accept-Encoding (identity, gzip,
+br) and reports the bytes on the wire and the latency (p50/p99) per encoding. The
+routes are the project list (GET /projects) and, with --with-plan, the plan JSON
+(GET /projects/{id}/plan) and raw markdown (GET /projects/{id}/plan/markdown).
+
+    uvicorn app.main:app --port 8000
+    python -m app.worker   # only for --with-plan; LLM_BACKEND=fake is enough
+    python scripts/bench_compression.py --base-url http://localhost:8000 --projects 200 --requests 200 --with-plan
+
+Needs httpx (`pip install -r requirements-dev.txt`). It registers a throwaway user and
+creates the projects first; --with-plan also generates a plan and waits for it.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import httpx
+
+ENCODINGS = ("identity", "gzip", "br")
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+async def setup(client, projects: int, with_plan: bool, timeout: float):
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    password = "bench-password"
+    (await client.post("/auth/register", json={"email": email, "name": "Bench", "password": password})).raise_for_status()
+    login = await client.post("/auth/login", data={"username": email, "password": password})
+    login.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+    ids = []
+    for i in range(projects):
+        response = await client.post("/projects", json={
+            "name": f"Bench {i}", "description": "Plataforma de entregas por drone para o varejo regional",
+            "main_sector": "Logística", "business_model": "B2B",
+        })
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    if not with_plan:
+        return None
+    project_id = ids[0]
+    (await client.post(f"/projects/{project_id}/complete")).raise_for_status()
+    deadline = time.monotonic() + timeout
+    while (await client.get(f"/projects/{project_id}")).json()["status"] != "ready":
+        if time.monotonic() > deadline:
+            raise SystemExit("The plan was not generated in time; is a worker running?")
+        await asyncio.sleep(0.5)
+    return project_id
+
+async def fetch(client, path: str, encoding: str):
+    """Bytes on the wire (before decoding) and latency of one request."""
+    started = time.perf_counter()
+    async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        response.raise_for_status()
+        size = 0
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+    return size, time.perf_counter() - started, response.headers.get("Content-Encoding", "identity")
+
+async def measure(client, path: str, encoding: str, total: int, concurrency: int):
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+    sizes, latencies, served = [], [], set()
+
+    async def worker():
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            size, latency, content_encoding = await fetch(client, path, encoding)
+            sizes.append(size)
+            latencies.append(latency)
+            served.add(content_encoding)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statistics.median(sizes), latencies, served
+
+async def main(base_url: str, projects: int, total: int, concurrency: int, with_plan: bool, timeout: float):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        plan_project = await setup(client, projects, with_plan, timeout)
+        paths = [f"/projects?limit={projects}"]
+        if plan_project:
+            paths += [f"/projects/{plan_project}/plan", f"/projects/{plan_project}/plan/markdown"]
+
+        print(f"{total} requests per encoding, concurrency {concurrency}")
+        for path in paths:
+            print(f"\nGET {path.replace(str(plan_project), '{id}')}")
+            identity_size = None
+            for encoding in ENCODINGS:
+                await measure(client, path, encoding, concurrency, concurrency)  # warm up
+                size, latencies, served = await measure(client, path, encoding, total, concurrency)
+                identity_size = identity_size or size
+                print(f"  {encoding:<8} served {'/'.join(sorted(served)):<8} {size / 1024:7.1f} KiB"
+                      f" ({size / identity_size:4.0%})  p50 {statistics.median(latencies) * 1000:6.1f}ms"
+                      f"  p99 {percentile(latencies, 99) * 1000:6.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes on the wire and latency per Accept-Encoding")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--projects", type=int, default=200, help="projects created, all listed in one page")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--with-plan", action="store_true", help="also generate a plan and measure the plan routes")
+    parser.add_argument("--plan-timeout", type=float, default=120)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.projects, args.requests, args.concurrency, args.with_plan, args.plan_timeout))
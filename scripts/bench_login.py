@@ -0,0 +1,76 @@
+"""
+Login throughput benchmark.
+
+Fires concurrent POST /auth/login requests at a running API while a probe keeps calling
+a cheap sync route (GET /auth/me), and reports login throughput and latency next to the
+probe latency. With bcrypt off the request threadpool, the probe should stay fast while
+logins queue up behind the hashing pool.
+
+    uvicorn app.main:app --port 8000
+    python scripts/bench_login.py --base-url http://localhost:8000 --concurrency 32 --requests 256
+
+Needs httpx (`pip install -r requirements-dev.txt`). It registers a throwaway user first.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import httpx
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+async def login_worker(client, queue, latencies, form):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        response = await client.post("/auth/login", data=form)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+async def probe(client, token, stop, latencies):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        started = time.perf_counter()
+        (await client.get("/auth/me", headers=headers)).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+async def main(base_url: str, concurrency: int, total: int):
+    limits = httpx.Limits(max_connections=concurrency + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        form = {"username": email, "password": "bench-password"}
+        (await client.post("/auth/register", json={"email": email, "name": "Bench", "password": form["password"]})).raise_for_status()
+        token = (await client.post("/auth/login", data=form)).json()["access_token"]
+
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+        login_latencies, probe_latencies = [], []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, token, stop, probe_latencies))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker(client, queue, login_latencies, form) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    print(f"{total} logins, concurrency {concurrency}: {total / elapsed:.1f} logins/s in {elapsed:.2f}s")
+    print(f"login  p50 {statistics.median(login_latencies) * 1000:.0f}ms  p95 {percentile(login_latencies, 95) * 1000:.0f}ms")
+    print(f"probe  p50 {statistics.median(probe_latencies) * 1000:.0f}ms  p95 {percentile(probe_latencies, 95) * 1000:.0f}ms"
+          f"  max {max(probe_latencies) * 1000:.0f}ms ({len(probe_latencies)} calls)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Login throughput under concurrency")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.concurrency, args.requests))
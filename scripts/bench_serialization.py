@@ -0,0 +1,101 @@
+"""
+JSON serialization microbenchmark for project lists.
+
+Serializes N projects (default 1000) the ways a JSON route can, and reports the median
+time per response:
+
+- jsonable_encoder: how FastAPI before 0.130 rendered a response_model route
+  (validate, jsonable_encoder, json.dumps)
+- dump_json: the response-model fast path the API uses now (validate, TypeAdapter.dump_json)
+- orjson: what ORJSONResponse would add on top of jsonable_encoder (needs `pip install orjson`)
+
+Both payload shapes are measured: the `GET /projects` page (dict rows from the keyset
+query into ProjectPage) and a plain list of ProjectResponse built from ORM objects. N is
+not capped at the API's page size, to make per-item costs visible. No server or database
+is needed, but settings are loaded, so run it from the repo root with the app's .env:
+
+    python scripts/bench_serialization.py --items 1000 --repeat 50
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models import Project
+from app.schemas.projects import ProjectPage, ProjectResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def make_rows(count: int):
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "name": f"Project {i}",
+            "description": "Plataforma de entregas por drone para o varejo regional. " * 3,
+            "main_sector": "Logística",
+            "business_model": "B2B SaaS",
+            "status": "ready",
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm up the validators
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def strategies(adapter: TypeAdapter, payload):
+    def legacy():
+        return json.dumps(jsonable_encoder(adapter.validate_python(payload, from_attributes=True))).encode()
+
+    def dump_json():
+        return adapter.dump_json(adapter.validate_python(payload, from_attributes=True))
+
+    found = {"jsonable_encoder": legacy, "dump_json": dump_json}
+    if orjson:
+        found["orjson"] = lambda: orjson.dumps(jsonable_encoder(adapter.validate_python(payload, from_attributes=True)))
+    return found
+
+def main(items: int, repeat: int):
+    rows = make_rows(items)
+    cases = {
+        "ProjectPage (GET /projects)": (TypeAdapter(ProjectPage), {"items": rows, "next_cursor": None}),
+        "List[ProjectResponse] (ORM)": (TypeAdapter(List[ProjectResponse]), [Project(**row) for row in rows]),
+    }
+    print(f"{items} projects, median of {repeat} runs")
+    for name, (adapter, payload) in cases.items():
+        results = {label: timed(fn, repeat) for label, fn in strategies(adapter, payload).items()}
+        body = len(adapter.dump_json(adapter.validate_python(payload, from_attributes=True)))
+        print(f"\n{name}, {body / 1024:.0f} KiB")
+        for label, ms in results.items():
+            print(f"  {label:<17} {ms:7.2f} ms")
+        validate = timed(lambda: adapter.validate_python(payload, from_attributes=True), repeat)
+        print(f"  {'(validation only)':<17} {validate:7.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON serialization cost of project lists")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.items, args.repeat)
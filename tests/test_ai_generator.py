@@ -0,0 +1,125 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.cache import MemoryCache
+from app.services.ai_generator import AIGeneratorService
+from app.services.business_plans import BusinessPlanService
+from app.services.llm import FakeLLMBackend, LLMNotConfiguredError, LLMResponse
+from app.services.llm_cache import LLMCache
+from app.services.plan_sections import ANALYZED_SECTION_NUMBERS, SECTION_NUMBERS, split_plan_sections
+
+DATA = {
+    "name": "Acme",
+    "description": "Entregas por drone",
+    "sector": "Logística",
+    "businessModel": "B2B",
+    "answers": "- Problema: entregas lentas",
+}
+
+class FailingBackend(FakeLLMBackend):
+    async def agenerate(self, model, prompt):
+        raise ConnectionError("LLM unavailable")
+
+    async def astream(self, model, prompt):
+        yield LLMResponse(text="# 1. Resumo Executivo\n")
+        raise ConnectionError("stream dropped")
+
+class BrokenJSONBackend(FakeLLMBackend):
+    def _analysis(self, prompt):
+        return "{not json"
+
+@pytest.fixture
+def ai_service():
+    service = AIGeneratorService()
+    service.backend = FakeLLMBackend()
+    service.cache = None
+    return service
+
+async def collect(chunks):
+    return "".join([chunk async for chunk in chunks])
+
+def test_streamed_plan_follows_the_section_structure(ai_service):
+    markdown = asyncio.run(collect(ai_service.stream_business_plan(DATA)))
+
+    assert list(split_plan_sections(markdown)) == SECTION_NUMBERS
+
+def test_sections_are_generated_one_call_each(ai_service):
+    sections = asyncio.run(ai_service.generate_plan_sections_async(DATA, [2, 7]))
+
+    assert list(sections) == [2, 7]
+    assert sections[7].startswith("# 7. ")
+
+def test_analysis_is_parsed_and_restricted_to_the_requested_sections(ai_service):
+    markdown = asyncio.run(collect(ai_service.stream_business_plan(DATA)))
+
+    full = asyncio.run(ai_service.generate_advanced_analysis_async(markdown))
+    partial = asyncio.run(ai_service.generate_advanced_analysis_async(markdown, [2, 3]))
+
+    assert full["overall_score"] == 70
+    assert len(full["sections_analysis"]) == len(ANALYZED_SECTION_NUMBERS)
+    assert [item["section_name"][:2] for item in partial["sections_analysis"]] == ["2.", "3."]
+
+def test_missing_backend_raises(ai_service):
+    ai_service.backend = None
+    with pytest.raises(LLMNotConfiguredError):
+        asyncio.run(ai_service.generate_executive_summary_async("# 1. Resumo"))
+
+def test_llm_errors_propagate(ai_service):
+    ai_service.backend = FailingBackend()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(ai_service.generate_executive_summary_async("# 1. Resumo"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(collect(ai_service.stream_business_plan(DATA)))
+
+def test_unparseable_analysis_raises_and_is_not_cached(ai_service):
+    ai_service.backend = BrokenJSONBackend()
+    ai_service.cache = LLMCache(MemoryCache())
+    prompt = ai_service._create_advanced_analysis_prompt("# 1. Resumo")
+
+    with pytest.raises(ValueError):
+        asyncio.run(ai_service.generate_advanced_analysis_async("# 1. Resumo"))
+    assert ai_service.cache.get(ai_service.model, prompt) is None
+
+def test_successful_responses_are_served_from_the_cache(ai_service):
+    ai_service.cache = LLMCache(MemoryCache())
+    first = asyncio.run(ai_service.generate_executive_summary_async("# 1. Resumo"))
+
+    ai_service.backend = FailingBackend()
+    assert asyncio.run(ai_service.generate_executive_summary_async("# 1. Resumo")) == first
+
+def test_full_pipeline_produces_plan_summary_and_analysis(ai_service, monkeypatch):
+    service = BusinessPlanService()
+    service.ai_service = ai_service
+    saved = []
+
+    async def fake_stream_plan(project_id, chunks):
+        saved.append(project_id)
+        return await collect(chunks)
+
+    monkeypatch.setattr(service, "_stream_plan", fake_stream_plan)
+    project_id = uuid4()
+    pipeline = service._build_pipeline(project_id, DATA)
+    results = asyncio.run(pipeline.run())
+
+    assert saved == [project_id]
+    assert list(split_plan_sections(results["plan"])) == SECTION_NUMBERS
+    assert results["summary"]
+    assert results["analysis"]["overall_score"] == 70
+    assert {"plan", "summary", "analysis", "total"} <= set(pipeline.timings)
+
+def test_dirty_sections_pipeline_only_rewrites_and_scores_dirty_sections(ai_service):
+    service = BusinessPlanService()
+    service.ai_service = ai_service
+    sections = {number: f"# {number}. Antigo\nTexto antigo." for number in SECTION_NUMBERS}
+
+    results = asyncio.run(service._build_dirty_sections_pipeline(uuid4(), DATA, "Resumo antigo", sections, [2, 10]).run())
+
+    regenerated = split_plan_sections(results["plan"])
+    assert regenerated[1] == sections[1]
+    assert regenerated[2] != sections[2] and regenerated[10] != sections[10]
+    # Section 1 did not change, so neither does the summary; 10 is not scored
+    assert results["summary"] == "Resumo antigo"
+    assert [item["section_name"][:2] for item in results["analysis"]["sections_analysis"]] == ["2."]
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import BusinessPlan, GenerationJob, ProjectStatus
+from app.services import business_plans
+from app.services.business_plans import BusinessPlanService
+from app.services.jobs import JobService
+from app.services.plans import PlanService
+
+OLD_PLAN = "# 1. Resumo Executivo\nPlano anterior."
+
+class StreamDropped(Exception):
+    pass
+
+@pytest.fixture
+def project(db, make_user, make_project, monkeypatch):
+    # The generation writes through short sessions of its own; here they join the test transaction
+    monkeypatch.setattr(business_plans, "SessionLocal", lambda: SessionLocal(bind=db.connection(), join_transaction_mode="create_savepoint"))
+    # Every chunk is written as it arrives
+    monkeypatch.setattr(settings, "PLAN_STREAM_FLUSH_CHARS", 1)
+    project = db.merge(make_project(make_user()))
+    project.status = ProjectStatus.GENERATING.value
+    db.commit()
+    return project
+
+@pytest.fixture
+def saved_plan(db, project):
+    plan = BusinessPlan(project_id=project.id, content_markdown=OLD_PLAN, content_markdown_gzip=b"gzip", executive_summary="Resumo")
+    db.add(plan)
+    db.commit()
+    return plan
+
+async def failing_chunks():
+    yield "# 1. Resumo Executivo\n"
+    raise StreamDropped()
+
+async def chunks(*texts):
+    for text in texts:
+        yield text
+
+def fail_job(db, project):
+    job = JobService().enqueue(db, project.id, project.user_id)
+    JobService()._finish_failed(db, job, "LLM unavailable")
+    db.commit()
+    return job
+
+def plan_progress(db, project):
+    return db.execute(PlanService()._plan_progress_query(project.id, 0)).one()
+
+def test_streaming_writes_a_draft_and_keeps_the_saved_plan(db, project, saved_plan):
+    with pytest.raises(StreamDropped):
+        asyncio.run(BusinessPlanService()._stream_plan(project.id, failing_chunks()))
+
+    db.refresh(saved_plan)
+    assert saved_plan.draft_markdown == "# 1. Resumo Executivo\n"
+    assert (saved_plan.content_markdown, saved_plan.content_markdown_gzip) == (OLD_PLAN, b"gzip")
+    # Stream readers follow the draft
+    assert plan_progress(db, project)[2] == "# 1. Resumo Executivo\n"
+
+def test_saving_swaps_the_draft_in(db, project, saved_plan):
+    service = BusinessPlanService()
+    markdown = asyncio.run(service._stream_plan(project.id, chunks("# 1. Resumo Executivo\n", "Plano novo.")))
+
+    service._save_plan(project.id, [], markdown, "Resumo novo", {"overall_score": 80}, {})
+
+    db.refresh(saved_plan)
+    db.refresh(project)
+    assert saved_plan.content_markdown == "# 1. Resumo Executivo\nPlano novo."
+    assert saved_plan.draft_markdown is None
+    assert project.status == ProjectStatus.READY.value
+
+def test_failed_regeneration_keeps_the_previous_plan(db, project, saved_plan):
+    with pytest.raises(StreamDropped):
+        asyncio.run(BusinessPlanService()._stream_plan(project.id, failing_chunks()))
+
+    job = fail_job(db, project)
+
+    db.refresh(saved_plan)
+    db.refresh(project)
+    assert db.get(GenerationJob, job.id).status == "failed"
+    assert saved_plan.content_markdown == OLD_PLAN
+    assert saved_plan.draft_markdown is None
+    assert project.status == ProjectStatus.READY.value
+    assert plan_progress(db, project)[2] == OLD_PLAN
+
+def test_failed_first_generation_returns_to_onboarding(db, project):
+    with pytest.raises(StreamDropped):
+        asyncio.run(BusinessPlanService()._stream_plan(project.id, failing_chunks()))
+
+    fail_job(db, project)
+
+    db.refresh(project)
+    assert project.status == ProjectStatus.ONBOARDING.value
+    assert db.query(BusinessPlan.draft_markdown).filter(BusinessPlan.project_id == project.id).scalar() is None
@@ -0,0 +1,46 @@
+import time
+
+from app.cache import MemoryCache
+
+def test_get_set_delete():
+    cache = MemoryCache()
+
+    cache.set("a", {"value": 1})
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("missing") is None
+
+    cache.delete("a")
+    cache.delete("missing")
+    assert cache.get("a") is None
+
+def test_evicts_the_least_recently_used_entry():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_entries_expire_after_their_ttl():
+    cache = MemoryCache(default_ttl=0.05)
+    cache.set("default", 1)
+    cache.set("longer", 2, ttl=10)
+    cache.set("forever", 3, ttl=0)
+
+    time.sleep(0.1)
+
+    assert cache.get("default") is None
+    assert cache.get("longer") == 2
+    # ttl=0 means no expiry, even with a default TTL
+    assert cache.get("forever") == 3
+
+def test_clear():
+    cache = MemoryCache()
+    cache.set("a", 1)
+    cache.clear()
+    assert len(cache) == 0
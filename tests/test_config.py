@@ -0,0 +1,9 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+
+def test_job_priority_weights_must_be_positive():
+    assert Settings(JOB_PRIORITY_WEIGHTS={"free": 1, "pro": 4}).JOB_PRIORITY_WEIGHTS == {"free": 1, "pro": 4}
+    with pytest.raises(ValidationError, match="at least 1"):
+        Settings(JOB_PRIORITY_WEIGHTS={"free": 0, "pro": 4})
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from app.services.llm_limiter import LLMRateLimiter
+
+def test_caps_calls_in_flight():
+    limiter = LLMRateLimiter(max_in_flight=2, requests_per_minute=0)
+    in_flight = peak = 0
+
+    async def call():
+        nonlocal in_flight, peak
+        async with limiter:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+
+def test_throttles_once_the_bucket_is_empty():
+    # 600/minute: the first 600 calls go through at once, then one every 0.1s
+    limiter = LLMRateLimiter(max_in_flight=1000, requests_per_minute=600)
+
+    async def run():
+        started = time.perf_counter()
+        for _ in range(600):
+            async with limiter:
+                pass
+        burst = time.perf_counter() - started
+        async with limiter:
+            pass
+        return burst, time.perf_counter() - started - burst
+
+    burst, throttled = asyncio.run(run())
+    assert burst < 0.05
+    assert throttled >= 0.08
+
+def test_releases_the_slot_when_the_call_fails():
+    limiter = LLMRateLimiter(max_in_flight=1, requests_per_minute=0)
+
+    async def failing():
+        async with limiter:
+            raise RuntimeError("boom")
+
+    async def run():
+        for _ in range(3):
+            try:
+                await failing()
+            except RuntimeError:
+                pass
+        # Would block forever if a failed call had kept the only slot
+        await asyncio.wait_for(limiter.__aenter__(), timeout=1)
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import pytest
+
+from app.models import GenerationJob, GenerationMode, ProjectStatus
+from app.services.onboarding import OnboardingService
+
+class RateLimited(Exception):
+    pass
+
+@pytest.fixture
+def project(db, make_user, make_project):
+    project = make_project(make_user())
+    return db.merge(project)
+
+def test_new_job_is_charged_once(db, project):
+    charges = []
+
+    job = OnboardingService().complete_onboarding(db, project, before_commit=lambda: charges.append(1))
+
+    assert charges == [1]
+    assert job.status == "queued"
+    assert project.status == ProjectStatus.GENERATING.value
+
+def test_replays_are_not_charged(db, project):
+    charges = []
+    service = OnboardingService()
+
+    first = service.complete_onboarding(db, project, idempotency_key="k", before_commit=lambda: charges.append(1))
+    again = service.complete_onboarding(db, project, idempotency_key="k", before_commit=lambda: charges.append(1))
+    active = service.complete_onboarding(db, project, before_commit=lambda: charges.append(1))
+
+    assert first.id == again.id == active.id
+    assert charges == [1]
+
+def test_losing_the_enqueue_race_is_not_charged(db, project, monkeypatch):
+    service = OnboardingService()
+    winner = service.complete_onboarding(db, project)
+    # The loser checked for an active job before the winner committed
+    lookups = iter([None])
+    get_active = service.job_service.get_active
+    monkeypatch.setattr(service.job_service, "get_active", lambda db, project_id: next(lookups, None) or get_active(db, project_id))
+    charges = []
+
+    job = service.complete_onboarding(db, project, before_commit=lambda: charges.append(1))
+
+    assert job.id == winner.id
+    assert charges == []
+
+def test_rate_limited_request_saves_nothing(db, project):
+    def reject():
+        raise RateLimited()
+
+    with pytest.raises(RateLimited):
+        OnboardingService().complete_onboarding(db, project, GenerationMode.FULL, before_commit=reject)
+
+    assert db.query(GenerationJob).filter(GenerationJob.project_id == project.id).count() == 0
+    assert db.get(type(project), project.id).status == ProjectStatus.ONBOARDING.value
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Project
+from app.services.pagination import KeysetPage
+
+FIELDS = ["name", "status"]
+
+def make_row(name: str, created_at: datetime):
+    row_id = uuid4()
+    mapping = {"name": name, "status": "onboarding", "created_at": created_at, "id": row_id}
+    return SimpleNamespace(_mapping=mapping, **mapping)
+
+def test_cursor_round_trip():
+    page = KeysetPage(Project, FIELDS)
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    row_id = uuid4()
+
+    cursor = page._encode_cursor(created_at, row_id)
+
+    assert "=" not in cursor
+    assert KeysetPage(Project, FIELDS, cursor=cursor).cursor == (created_at, row_id)
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "bm90IGpzb24", "WyJ4IiwgInkiXQ"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        KeysetPage(Project, FIELDS, cursor=cursor)
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Invalid cursor"
+
+def test_fields_default_to_all_allowed():
+    assert KeysetPage(Project, FIELDS).fields == FIELDS
+
+def test_fields_are_deduplicated_in_request_order():
+    assert KeysetPage(Project, FIELDS, fields="status, name,status").fields == ["status", "name"]
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as exc:
+        KeysetPage(Project, FIELDS, fields="name,password_hash")
+    assert exc.value.status_code == 400
+    assert "password_hash" in exc.value.detail
+
+def test_query_fetches_one_extra_row_and_seeks_past_the_cursor():
+    cursor = KeysetPage(Project, FIELDS)._encode_cursor(datetime.now(timezone.utc), uuid4())
+
+    first = KeysetPage(Project, FIELDS, limit=10).query(Project.user_id == uuid4())
+    after = KeysetPage(Project, FIELDS, cursor=cursor, limit=10).query(Project.user_id == uuid4())
+
+    assert first._limit_clause.value == 11
+    assert "(projects.created_at, projects.id) <" not in str(first)
+    assert "(projects.created_at, projects.id) <" in str(after)
+
+def test_build_returns_next_cursor_only_when_there_are_more_rows():
+    now = datetime.now(timezone.utc)
+    rows = [make_row(f"p{i}", now) for i in range(3)]
+
+    full = KeysetPage(Project, ["name"], limit=2).build(rows)
+    last = KeysetPage(Project, ["name"], limit=3).build(rows)
+
+    assert full["items"] == [{"name": "p0"}, {"name": "p1"}]
+    assert KeysetPage(Project, ["name"], cursor=full["next_cursor"]).cursor == (now, rows[1].id)
+    assert last["next_cursor"] is None
+    assert len(last["items"]) == 3
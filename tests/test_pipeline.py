@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.pipeline import Pipeline, PipelineStage
+
+def test_stages_receive_their_dependencies_results():
+    async def plan():
+        return "plan"
+
+    async def summary(markdown):
+        return f"summary of {markdown}"
+
+    async def report(markdown, summary_text):
+        return [markdown, summary_text]
+
+    pipeline = Pipeline([
+        PipelineStage("plan", plan),
+        PipelineStage("summary", summary, depends_on=["plan"]),
+        PipelineStage("report", report, depends_on=["plan", "summary"]),
+    ])
+    results = asyncio.run(pipeline.run())
+
+    assert results == {
+        "plan": "plan",
+        "summary": "summary of plan",
+        "report": ["plan", "summary of plan"],
+    }
+    assert set(pipeline.timings) == {"plan", "summary", "report", "total"}
+
+def test_independent_stages_run_concurrently():
+    async def slow(_=None):
+        await asyncio.sleep(0.2)
+
+    pipeline = Pipeline([
+        PipelineStage("plan", slow),
+        PipelineStage("summary", slow, depends_on=["plan"]),
+        PipelineStage("analysis", slow, depends_on=["plan"]),
+    ])
+    started = time.perf_counter()
+    asyncio.run(pipeline.run())
+
+    # plan, then summary and analysis side by side: ~0.4s rather than ~0.6s
+    assert time.perf_counter() - started < 0.55
+    assert pipeline.timings["total"] < 0.55
+
+def test_undefined_dependencies_are_rejected():
+    async def stage(_=None):
+        return None
+
+    with pytest.raises(ValueError, match="undefined stages"):
+        Pipeline([PipelineStage("summary", stage, depends_on=["plan"])])
+    # Dependencies must be declared before the stages using them
+    with pytest.raises(ValueError):
+        Pipeline([PipelineStage("summary", stage, depends_on=["plan"]), PipelineStage("plan", stage)])
+
+def test_a_failing_stage_fails_the_run_and_cancels_the_rest():
+    finished = []
+
+    async def plan():
+        return "plan"
+
+    async def summary(_):
+        raise RuntimeError("LLM down")
+
+    async def analysis(_):
+        await asyncio.sleep(1)
+        finished.append("analysis")
+
+    pipeline = Pipeline([
+        PipelineStage("plan", plan),
+        PipelineStage("summary", summary, depends_on=["plan"]),
+        PipelineStage("analysis", analysis, depends_on=["plan"]),
+    ])
+
+    async def run():
+        with pytest.raises(RuntimeError, match="LLM down"):
+            await pipeline.run()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert finished == []
+    assert "total" not in pipeline.timings
@@ -0,0 +1,69 @@
+import pytest
+
+from app.services.plan_sections import (
+    ANALYZED_SECTION_NUMBERS,
+    PLAN_SECTIONS,
+    SECTION_NUMBERS,
+    get_section,
+    join_plan_sections,
+    section_number_from_name,
+    split_plan_sections,
+)
+
+PLAN = """# 1. Resumo Executivo
+Resumo.
+
+# 2. Problema
+## 2.1 Dor do cliente
+Texto com 3. números no meio.
+
+## 3. Solução
+Solução."""
+
+def test_section_constants():
+    assert SECTION_NUMBERS == list(range(1, len(PLAN_SECTIONS) + 1))
+    assert ANALYZED_SECTION_NUMBERS == SECTION_NUMBERS[:9]
+    for section in PLAN_SECTIONS:
+        assert section.template.startswith(f"# {section.number}. {section.title}")
+
+def test_get_section():
+    assert get_section(7).number == 7
+    with pytest.raises(ValueError):
+        get_section(99)
+
+@pytest.mark.parametrize("name, expected", [
+    ("7. Plano Financeiro", 7),
+    (" 10. Pitch", 10),
+    ("Plano Financeiro", None),
+    (None, None),
+])
+def test_section_number_from_name(name, expected):
+    assert section_number_from_name(name) == expected
+
+def test_split_keeps_subsections_inside_their_section():
+    sections = split_plan_sections(PLAN)
+
+    assert list(sections) == [1, 2, 3]
+    assert sections[1] == "# 1. Resumo Executivo\nResumo."
+    assert sections[2].startswith("# 2. Problema\n## 2.1 Dor do cliente")
+    assert sections[3] == "## 3. Solução\nSolução."
+
+def test_split_ignores_text_before_the_first_heading():
+    assert split_plan_sections("Intro\n\n" + PLAN).keys() == {1, 2, 3}
+    assert split_plan_sections("") == {}
+    assert split_plan_sections(None) == {}
+
+def test_join_round_trips_split():
+    assert join_plan_sections(split_plan_sections(PLAN)) == PLAN
+
+def test_join_orders_sections_and_skips_empty_ones():
+    sections = {3: "# 3. C", 1: "# 1. A", 2: ""}
+
+    assert join_plan_sections(sections) == "# 1. A\n\n# 3. C"
+    assert join_plan_sections(sections, order=[3, 1]) == "# 3. C\n\n# 1. A"
+
+def test_replacing_one_section_keeps_the_others():
+    sections = split_plan_sections(PLAN)
+    patched = join_plan_sections({**sections, 2: "# 2. Problema\nNovo texto."})
+
+    assert split_plan_sections(patched) == {**sections, 2: "# 2. Problema\nNovo texto."}
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.services.plans import PlanService
+
+plan_service = PlanService()
+PLAN_ID = uuid4()
+UPDATED_AT = datetime(2026, 5, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+def test_plan_etag_changes_with_the_version():
+    etag = plan_service.plan_etag(PLAN_ID, UPDATED_AT)
+
+    assert etag == f'"{PLAN_ID.hex}-{int(UPDATED_AT.timestamp() * 1_000_000)}"'
+    assert etag != plan_service.plan_etag(PLAN_ID, UPDATED_AT.replace(microsecond=123457))
+
+def test_encoded_representations_get_their_own_etag():
+    identity = plan_service.plan_etag(PLAN_ID, UPDATED_AT)
+    gzipped = plan_service.plan_etag(PLAN_ID, UPDATED_AT, "gzip")
+
+    assert gzipped == identity[:-1] + '-gzip"'
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('"{etag}"', True),
+    ('W/"{etag}"', True),
+    ('"other", "{etag}"', True),
+    ('"other"', False),
+    ('"{etag}-gzip"', False),
+])
+def test_etag_matches(if_none_match, matches):
+    etag = f'"{PLAN_ID.hex}"'
+    header = if_none_match.format(etag=PLAN_ID.hex) if if_none_match else if_none_match
+    assert plan_service.etag_matches(header, etag) is matches
+
+def test_not_modified_response():
+    response = plan_service.not_modified('"abc"', vary="Accept-Encoding")
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == '"abc"'
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert "Vary" not in plan_service.not_modified('"abc"').headers
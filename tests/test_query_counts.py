@@ -0,0 +1,99 @@
+"""
+Statements per request on the read paths that used to issue one query per related row
+or re-load the project after the ownership check. Counts must not grow with the data.
+"""
+import pytest
+
+from app.models import BusinessPlan, PlanSectionAnalysis
+from app.services.projects import ONBOARDING_QUESTIONS
+
+@pytest.fixture
+def owner(make_user, client):
+    client.user = make_user()
+    return client.user
+
+@pytest.fixture
+def project(owner, make_project):
+    return make_project(owner)
+
+@pytest.fixture
+def plan_with_sections(db, project):
+    def factory(section_count: int) -> BusinessPlan:
+        plan = BusinessPlan(
+            project_id=project.id,
+            content_markdown="# 1. Resumo Executivo\nTexto.",
+            executive_summary="Resumo.",
+            overall_score=70,
+            sections=[
+                PlanSectionAnalysis(section_name=f"{i}. Seção", score=70, suggestions=["Sugestão"])
+                for i in range(1, section_count + 1)
+            ],
+        )
+        db.add(plan)
+        db.commit()
+        db.refresh(plan)
+        return plan
+
+    return factory
+
+def answers_payload(count: int):
+    return [{"question": question, "answer": f"Resposta {i}"} for i, question in enumerate(ONBOARDING_QUESTIONS[:count])]
+
+def test_plan_is_loaded_with_its_ownership_check(client, count_queries, project, plan_with_sections):
+    plan_with_sections(0)
+
+    with count_queries() as queries:
+        response = client.get(f"/projects/{project.id}/plan")
+
+    assert response.status_code == 200
+    assert queries.count == 1
+
+@pytest.mark.parametrize("section_count", [1, 9])
+def test_plan_analysis_loads_sections_in_the_same_query(client, count_queries, project, plan_with_sections, section_count):
+    plan_with_sections(section_count)
+
+    with count_queries() as queries:
+        response = client.get(f"/projects/{project.id}/plan/analysis")
+
+    assert response.status_code == 200
+    assert len(response.json()["sections"]) == section_count
+    assert queries.count == 1
+
+def test_missing_plan_costs_one_more_query(client, count_queries, project):
+    with count_queries() as queries:
+        response = client.get(f"/projects/{project.id}/plan/analysis")
+
+    assert response.status_code == 404
+    assert queries.count == 2
+
+def test_onboarding_answers_take_two_queries(client, count_queries, project):
+    client.put(f"/projects/{project.id}/onboarding", json=answers_payload(len(ONBOARDING_QUESTIONS)))
+
+    with count_queries() as queries:
+        response = client.get(f"/projects/{project.id}/onboarding")
+
+    assert response.status_code == 200
+    assert len(response.json()) == len(ONBOARDING_QUESTIONS)
+    # Ownership check + answers
+    assert queries.count == 2
+
+def test_saving_answers_does_not_grow_with_their_number(client, count_queries, project, plan_with_sections):
+    plan_with_sections(0)
+    counts = []
+    for count in (1, len(ONBOARDING_QUESTIONS)):
+        with count_queries() as queries:
+            response = client.put(f"/projects/{project.id}/onboarding", json=answers_payload(count))
+        assert response.status_code == 200
+        assert len(response.json()) == count
+        counts.append(queries.count)
+
+    # Ownership check + one upsert for all answers + loading and updating the plan's dirty sections
+    assert counts == [4, 4]
+
+def test_complete_onboarding_does_not_reload_the_project(client, count_queries, project):
+    with count_queries() as queries:
+        response = client.post(f"/projects/{project.id}/complete")
+
+    assert response.status_code == 200
+    project_selects = [s for s in queries.statements if s.lstrip().startswith("SELECT") and "FROM projects" in s]
+    assert len(project_selects) == 1
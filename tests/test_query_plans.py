@@ -0,0 +1,169 @@
+"""
+EXPLAIN checks for the hot lookups: they must be index scans, not sequential scans, once
+the tables hold more than a handful of rows. The statements are the ones the services
+actually send, captured with the `count_queries` listener.
+
+Seed size: EXPLAIN_SEED_PROJECTS projects (default 5000), each with ten answers, a plan
+with nine section analyses and two consulting requests. EXPLAIN_SEED_PROJECTS=100000
+gives the 1M answers the indexes were sized for; seeding that takes several minutes.
+The seed is shared by the module (the tests only read) and rolled back at the end.
+"""
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import SessionLocal
+from app.dependencies import EntityNotFoundException
+from app.schemas.projects import ProjectCreate
+from app.services.consulting import ConsultingService
+from app.services.onboarding import OnboardingService
+from app.services.plans import PlanService
+from app.services.projects import ONBOARDING_QUESTIONS, ProjectService
+
+SEED_PROJECTS = int(os.environ.get("EXPLAIN_SEED_PROJECTS", "5000"))
+PROJECTS_PER_USER = 10
+
+@pytest.fixture(scope="module")
+def db(db_engine):
+    """Module-wide session, so the seed is built once; everything is rolled back at the end."""
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture(scope="module")
+def seeded(db):
+    """Users, projects, answers, plans, section analyses and consulting requests, with fresh planner statistics."""
+    connection = db.connection()
+    # Large seeds can outlast DB_STATEMENT_TIMEOUT_MS; SET LOCAL ends with the test's transaction
+    connection.exec_driver_sql("SET LOCAL statement_timeout = 0")
+    connection.exec_driver_sql(
+        "INSERT INTO users (id, name, email, password_hash, is_active, access_level) "
+        "SELECT gen_random_uuid(), 'Seed', 'seed-' || i || '-' || gen_random_uuid() || '@example.com', 'x', true, 'free' "
+        "FROM generate_series(1, %(users)s) AS i",
+        {"users": max(1, SEED_PROJECTS // PROJECTS_PER_USER)},
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO projects (id, user_id, name, status, created_at) "
+        "SELECT gen_random_uuid(), u.id, 'Project ' || i, 'onboarding', now() "
+        "FROM users u CROSS JOIN generate_series(1, %(per_user)s) AS i WHERE u.name = 'Seed'",
+        {"per_user": PROJECTS_PER_USER},
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO onboarding_answers (id, project_id, question, answer, created_at) "
+        "SELECT gen_random_uuid(), p.id, q.question, '', now() "
+        "FROM projects p CROSS JOIN unnest(%(questions)s::text[]) AS q(question)",
+        {"questions": ONBOARDING_QUESTIONS},
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO business_plans (id, project_id, content_markdown, overall_score) "
+        "SELECT gen_random_uuid(), p.id, '# 1. Resumo Executivo', 70 FROM projects p"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO plan_section_analyses (id, business_plan_id, section_name, score) "
+        "SELECT gen_random_uuid(), b.id, i || '. Seção', 70 FROM business_plans b CROSS JOIN generate_series(1, 9) AS i"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO consulting_requests (id, user_id, project_id, type, objective, status, created_at) "
+        "SELECT gen_random_uuid(), p.user_id, p.id, 'mentoring', 'Objetivo', 'pending', now() - i * interval '1 day' "
+        "FROM projects p CROSS JOIN generate_series(1, 2) AS i"
+    )
+    tables = ("users", "projects", "onboarding_answers", "business_plans", "plan_section_analyses", "consulting_requests")
+    for table in tables:
+        connection.exec_driver_sql(f"ANALYZE {table}")
+    return connection.exec_driver_sql(
+        "SELECT user_id, id, name FROM projects ORDER BY user_id, name OFFSET %(middle)s LIMIT 1",
+        {"middle": SEED_PROJECTS // 2},
+    ).one()
+
+def explain(db, statement, parameters) -> dict:
+    rows = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    return rows[0]["Plan"]
+
+def scans(plan: dict):
+    """
+    (relation, index used) of every scan node in the plan tree; the index is None for a
+    sequential scan. A bitmap heap scan reports the index its bitmap was built from.
+    """
+    found = []
+    if "Relation Name" in plan:
+        index = plan.get("Index Name")
+        if plan["Node Type"] == "Bitmap Heap Scan":
+            index = next(node["Index Name"] for node in walk(plan) if node["Node Type"] == "Bitmap Index Scan")
+        found.append((plan["Relation Name"], index))
+    for child in plan.get("Plans", []):
+        found.extend(scans(child))
+    return found
+
+def walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+def scan_of(plan: dict, table: str):
+    return [scan for scan in scans(plan) if scan[0] == table]
+
+def captured_lookup(queries, table: str):
+    for statement, parameters in zip(queries.statements, queries.parameters):
+        if statement.lstrip().startswith("SELECT") and f"FROM {table}" in statement:
+            return statement, parameters
+    raise AssertionError(f"No SELECT on {table} was sent: {queries.statements}")
+
+def test_duplicate_project_name_lookup_uses_an_index(db, seeded, count_queries):
+    user_id, _, name = seeded
+    with count_queries() as queries, pytest.raises(HTTPException):
+        ProjectService().create_project(db, ProjectCreate(name=name, description="d", main_sector="s", business_model="b"), user_id)
+
+    plan = explain(db, *captured_lookup(queries, "projects"))
+
+    assert scans(plan) == [("projects", "ix_projects_user_id_name")], plan
+
+def test_onboarding_answer_lookup_uses_an_index(db, seeded, count_queries):
+    _, project_id, _ = seeded
+    with count_queries() as queries, pytest.raises(EntityNotFoundException):
+        # Unknown question: the lookup runs and nothing is written
+        OnboardingService().update_single_answer(db, project_id, "unknown_question", "x")
+
+    plan = explain(db, *captured_lookup(queries, "onboarding_answers"))
+
+    assert scans(plan) == [("onboarding_answers", "uq_onboarding_answers_project_id_question")], plan
+
+def test_project_list_uses_an_index(db, seeded, count_queries):
+    user_id, _, _ = seeded
+    with count_queries() as queries:
+        ProjectService().get_projects(db, user_id)
+
+    plan = explain(db, *captured_lookup(queries, "projects"))
+
+    # Either index leading with user_id serves the filter; the keyset one also avoids the sort
+    assert scans(plan) in (
+        [("projects", "ix_projects_user_id_created_at_id")],
+        [("projects", "ix_projects_user_id_name")],
+    ), plan
+
+def test_plan_section_analyses_are_joined_through_an_index(db, seeded, count_queries):
+    user_id, project_id, _ = seeded
+    with count_queries() as queries:
+        PlanService().get_owned_plan(db, project_id, user_id, with_sections=True)
+
+    plan = explain(db, *captured_lookup(queries, "business_plans"))
+
+    assert scan_of(plan, "plan_section_analyses") == [
+        ("plan_section_analyses", "ix_plan_section_analyses_business_plan_id")
+    ], plan
+    assert all(index for _, index in scans(plan)), plan
+
+def test_consulting_request_list_uses_an_index(db, seeded, count_queries):
+    user_id, _, _ = seeded
+    with count_queries() as queries:
+        ConsultingService().get_requests(db, user_id)
+
+    plan = explain(db, *captured_lookup(queries, "consulting_requests"))
+
+    assert scans(plan) == [("consulting_requests", "ix_consulting_requests_user_id_created_at_id")], plan
@@ -0,0 +1,61 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services.rate_limit import MemoryRateLimitBackend, RateLimiter, parse_limit
+
+LIMITS = {
+    "free": {"api": "2/minute", "generation": "1/hour"},
+    "admin": {"api": "100/second"},
+}
+
+class FailingBackend:
+    def take(self, key, capacity, rate):
+        raise ConnectionError("store unavailable")
+
+@pytest.mark.parametrize("spec, expected", [
+    ("5/hour", (5, 5 / 3600)),
+    ("120/minute", (120, 2.0)),
+    ("10/seconds", (10, 10.0)),
+    ("1 / day", (1, 1 / 86400)),
+])
+def test_parse_limit(spec, expected):
+    assert parse_limit(spec) == expected
+
+def test_parse_limit_rejects_unknown_periods():
+    with pytest.raises(KeyError):
+        parse_limit("5/week")
+
+def test_memory_backend_empties_the_bucket_then_asks_to_wait():
+    backend = MemoryRateLimitBackend(max_entries=10)
+
+    assert backend.take("k", 2, 1.0) == 0
+    assert backend.take("k", 2, 1.0) == 0
+    assert 0 < backend.take("k", 2, 1.0) <= 1.0
+    # Other keys have their own bucket
+    assert backend.take("other", 2, 1.0) == 0
+
+def test_limiter_uses_the_default_tier_for_unknown_levels():
+    limiter = RateLimiter(MemoryRateLimitBackend(max_entries=10), LIMITS, default_tier="free")
+
+    assert limiter.limit_for(None, "api") == parse_limit("2/minute")
+    assert limiter.limit_for("enterprise", "generation") == parse_limit("1/hour")
+    assert limiter.limit_for("admin", "generation") is None
+
+def test_limiter_limits_per_user_and_route():
+    limiter = RateLimiter(MemoryRateLimitBackend(max_entries=10), LIMITS, default_tier="free")
+    user_id = uuid4()
+
+    assert limiter.check(user_id, "free", "generation", "/complete") == 0
+    assert limiter.check(user_id, "free", "generation", "/complete") > 0
+    assert limiter.check(user_id, "free", "generation", "/other") == 0
+    assert limiter.check(uuid4(), "free", "generation", "/complete") == 0
+
+def test_unlimited_scope_never_waits():
+    limiter = RateLimiter(MemoryRateLimitBackend(max_entries=10), LIMITS, default_tier="free")
+    user_id = uuid4()
+    assert all(limiter.check(user_id, "admin", "generation", "/complete") == 0 for _ in range(20))
+
+def test_limiter_fails_open_when_the_backend_is_down():
+    limiter = RateLimiter(FailingBackend(), LIMITS, default_tier="free")
+    assert limiter.check(uuid4(), "free", "api", "/projects") == 0
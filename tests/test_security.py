@@ -0,0 +1,45 @@
+import asyncio
+
+import bcrypt
+
+from app.config import settings
+from app.security import (
+    get_password_hash,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async,
+)
+
+def test_hash_and_verify():
+    hashed = get_password_hash("correct horse")
+
+    assert verify_password("correct horse", hashed)
+    assert not verify_password("wrong horse", hashed)
+
+def test_long_passwords_are_not_truncated():
+    # bcrypt alone only looks at the first 72 bytes
+    prefix = "a" * 72
+    hashed = get_password_hash(prefix + "one")
+
+    assert verify_password(prefix + "one", hashed)
+    assert not verify_password(prefix + "two", hashed)
+
+def test_async_variants_match_the_sync_ones():
+    hashed = asyncio.run(get_password_hash_async("secret"))
+
+    assert verify_password("secret", hashed)
+    assert asyncio.run(verify_password_async("secret", get_password_hash("secret")))
+    assert not asyncio.run(verify_password_async("other", hashed))
+
+def test_new_hashes_use_the_configured_cost():
+    assert not password_needs_rehash(get_password_hash("secret"))
+
+def test_hashes_with_another_cost_need_rehash():
+    other_cost = settings.BCRYPT_ROUNDS + 1
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=other_cost)).decode()
+    assert password_needs_rehash(hashed)
+
+def test_malformed_hashes_need_rehash():
+    assert password_needs_rehash("not-a-bcrypt-hash")
+    assert password_needs_rehash("$2b$xx$abc")